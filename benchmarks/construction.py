@@ -0,0 +1,176 @@
+'''
+Scalability benchmark for WeaverletApp construction.
+
+Builds synthetic component trees of growing size and, for each one, reports the time of each phase of
+WeaverletApp.__init__ (from the startup profiler), the memory allocated per WeaverletComponent instance
+(tracemalloc, measured while the components are created), the growth of the peak RSS per component while
+the WeaverletApp is built (layout, callbacks and Dash app included), and the peak RSS of the process.
+Each tree is built in a fresh process, so that peak RSS is not inherited from the previous, larger trees.
+
+Shapes:
+- chain: components nested in each other, in chains of at most CHAIN_DEPTH components (the layouts of
+  nested components are built recursively), as many chains as needed under a ComponentsList;
+- list: a root component holding all the other components in a ComponentsList;
+- dict: a root component holding all the other components in a ComponentsDict;
+- array: a root component holding all the other components in a ComponentArray, sharing one callback;
+- router: a SimpleRouterComponent with one page per two components, each page holding one child.
+Every component has a button, a label and a callback (registered once for all the members of an array).
+
+    python benchmarks/construction.py
+    python benchmarks/construction.py --shapes list router --sizes 1000 10000 --json construction.json
+'''
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dash import html
+from dash_extensions.enrich import Input, Output
+from weaverlet.base import WeaverletComponent, WeaverletApp, ComponentsList, ComponentsDict, ComponentArray, Identifier
+from weaverlet.components import SimpleRouterComponent, EmptyLayoutComponent
+
+SHAPES = ['chain', 'list', 'dict', 'array', 'router']
+SIZES = [1000, 10000, 100000]
+CHAIN_DEPTH = 500
+PHASES = ['create_dash_app', 'build_component_tree', 'initialize', 'layout', 'register_callbacks']
+
+
+class NodeList(ComponentsList):
+    def get_components(self):
+        return self
+
+
+class NodeDict(ComponentsDict):
+    def get_components(self):
+        return self.values()
+
+
+class NodeComponent(WeaverletComponent):
+
+    button_id = Identifier()
+    label_id = Identifier()
+
+    def __init__(self, child=None, children=None):
+        super().__init__()
+        if child is not None:
+            self.child = child
+        if children is not None:
+            self.children = children
+
+    def get_layout(self):
+        layout = [html.Button('+', id=self.button_id), html.P(id=self.label_id)]
+        if hasattr(self, 'child'):
+            layout.append(self.child())
+        if hasattr(self, 'children'):
+            layout += [child() for child in self.children.get_components()]
+        return html.Div(layout)
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            Output(self.label_id, 'children'),
+            Input(self.button_id, 'n_clicks')
+        )
+        def update_label(n_clicks):
+            return n_clicks
+
+
+def build_tree(shape, size):
+    if shape == 'chain':
+        chains = NodeList()
+        remaining = size - 1
+        while remaining > 0:
+            depth = min(remaining, CHAIN_DEPTH)
+            node = NodeComponent()
+            for _ in range(depth - 1):
+                node = NodeComponent(child=node)
+            chains.append(node)
+            remaining -= depth
+        return NodeComponent(children=chains)
+    if shape == 'list':
+        return NodeComponent(children=NodeList(NodeComponent() for _ in range(size - 1)))
+    if shape == 'dict':
+        return NodeComponent(children=NodeDict((f'node_{i}', NodeComponent()) for i in range(size - 1)))
+    if shape == 'array':
+        return NodeComponent(children=ComponentArray(NodeComponent() for _ in range(size - 1)))
+    if shape == 'router':
+        pages = {f'/page_{i}': NodeComponent(child=NodeComponent()) for i in range((size - 2) // 2)}
+        return SimpleRouterComponent(routes=pages, not_found_page_component=EmptyLayoutComponent())
+    raise ValueError(f'Unknown shape {shape}.')
+
+
+def get_max_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def run_one(shape, size):
+    tracemalloc.start()
+    root = build_tree(shape, size)
+    tree_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_before = get_max_rss_bytes()
+
+    start = time.perf_counter()
+    wapp = WeaverletApp(root_component=root, profile=True)
+    total = time.perf_counter() - start
+
+    components = len(wapp._components)
+    return {
+        'shape': shape,
+        'size': size,
+        'components': components,
+        'callbacks': len(wapp.callbacks.specs),
+        'total_s': total,
+        'phases_s': {name: elapsed for name, elapsed in wapp.profiler.to_dict()['phases'].items()},
+        'bytes_per_component': tree_bytes / components,
+        'app_rss_bytes_per_component': (get_max_rss_bytes() - rss_before) / components,
+        'peak_rss_mib': get_max_rss_bytes() / 2**20
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scalability benchmark for WeaverletApp construction.')
+    parser.add_argument('--shapes', nargs='*', choices=SHAPES, default=SHAPES)
+    parser.add_argument('--sizes', nargs='*', type=int, default=SIZES, help='number of components of the trees')
+    parser.add_argument('--json', help='file where the results are saved')
+    parser.add_argument('--single', nargs=2, metavar=('SHAPE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # the layouts of chains are built recursively
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), CHAIN_DEPTH * 10))
+
+    if args.single is not None:
+        logging.disable(logging.INFO)
+        print(json.dumps(run_one(args.single[0], int(args.single[1]))))
+        return
+
+    print(f'{"shape":<7} {"components":>10} {"callbacks":>10} {"total (s)":>10} ' + ' '.join(f'{name[:14]:>14}' for name in PHASES) +
+          f' {"B/component":>12} {"app B/comp.":>12} {"peak RSS (MiB)":>15}')
+    results = []
+    for shape in args.shapes:
+        for size in args.sizes:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--single', shape, str(size)],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            phases = ' '.join(f'{result["phases_s"].get(name, 0.0):>14.3f}' for name in PHASES)
+            print(f'{shape:<7} {result["components"]:>10} {result["callbacks"]:>10} {result["total_s"]:>10.3f} {phases} '
+                  f'{result["bytes_per_component"]:>12.0f} {result["app_rss_bytes_per_component"]:>12.0f} {result["peak_rss_mib"]:>15.1f}')
+
+    if args.json is not None:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
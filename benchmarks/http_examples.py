@@ -0,0 +1,424 @@
+'''
+HTTP-level benchmark of the example apps.
+
+Each app under examples/ is built in-process and driven through the Flask test client. The requests are
+recorded by replaying the app once like a browser would: /_dash-layout, then every server-side callback
+fired by the browser (buttons clicked once, each route of the routers visited), then the callbacks fired
+by their outputs, with the values returned by the previous ones. Each recorded request is then repeated,
+reporting throughput, p50/p99 latency and the peak memory allocated per request (tracemalloc).
+
+Requests answered with an error are recorded as failures, as are examples that cannot be loaded.
+
+Results can be stored as a baseline, and later runs compared against it. These are flagged as regressions
+and make the script exit with status 1:
+- p50 latencies and allocations higher than the baseline by more than the threshold;
+- failed requests;
+- requests of the baseline that were not made, and requests missing from the baseline.
+Latencies depend on the machine. Each run times a fixed pure-Python workload (calibration_ms), and the
+baseline latencies are scaled by the ratio of both calibrations before comparing. This only roughly
+accounts for a different machine. The committed baseline is a reference only: update it on the machine
+running the comparison before relying on the latency gate.
+
+    python benchmarks/http_examples.py
+    python benchmarks/http_examples.py --update-baseline
+    python benchmarks/http_examples.py --examples 04 05 --threshold 0.5
+'''
+import os
+import sys
+import json
+import glob
+import time
+import runpy
+import re
+import logging
+import argparse
+import warnings
+import tracemalloc
+from collections import deque
+from dash._utils import split_callback_id, stringify_id
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES_DIR = os.path.join(HERE, '..', 'examples')
+DEFAULT_BASELINE = os.path.join(HERE, 'baselines', 'http_examples.json')
+# queues a real background job on every request
+SKIPPED_EXAMPLES = ('15_background_signal_app.py',)
+# random prefix of the component hex ids, removed from the request names so they are stable across runs
+HEX_ID_PATTERN = re.compile(r'\b[0-9a-f]{7}-')
+ROUNDS = 5
+# key of the calibration time in the baseline files, next to the example names
+CALIBRATION_KEY = '_calibration_ms'
+# metrics compared against the baseline; throughput and p99 are reported only, being too noisy to gate on
+GATED_METRICS = ('p50_ms', 'peak_kib')
+
+
+def load_example(path):
+    # the examples start a development server when run; the benchmark only needs the app
+    from dash_extensions.enrich import DashProxy
+    run_server = DashProxy.run_server
+    DashProxy.run_server = lambda *args, **kwargs: None
+    try:
+        return runpy.run_path(path)['wapp']
+    finally:
+        DashProxy.run_server = run_server
+
+
+def parse_id(component_id):
+    # pattern-matching and multiplexer ids are dicts, serialized as JSON in the dependencies
+    return json.loads(component_id) if component_id.startswith('{') else component_id
+
+
+def get_prop_id(component_id, prop):
+    return f'{stringify_id(component_id)}.{prop}'
+
+
+def collect_layout_values(node, values, layout_ids):
+    if isinstance(node, list):
+        for item in node:
+            collect_layout_values(item, values, layout_ids)
+    elif isinstance(node, dict):
+        if set(node) == {'type', 'namespace', 'props'}:
+            props = node['props']
+            if 'id' in props:
+                if isinstance(props['id'], dict):
+                    layout_ids.append(props['id'])
+                for prop, value in props.items():
+                    values[get_prop_id(props['id'], prop)] = value
+            for value in props.values():
+                collect_layout_values(value, values, layout_ids)
+
+
+def is_wildcard(component_id):
+    # MATCH, ALL and ALLSMALLER are serialized as ["MATCH"], ["ALL"] and ["ALLSMALLER"]
+    return isinstance(component_id, dict) and any(isinstance(value, list) for value in component_id.values())
+
+
+def matches(pattern, component_id):
+    return isinstance(component_id, dict) and pattern.keys() == component_id.keys() and \
+        all(isinstance(value, list) or component_id[key] == value for key, value in pattern.items())
+
+
+def get_route_pathnames(wapp):
+    from weaverlet.base import RouterComponent
+    pathnames = []
+    for component in wapp.get_components_by_class(RouterComponent):
+        if hasattr(component, '_route_table'):
+            prefix = component.get_context().get('prefix', '') if component.use_prefix else ''
+            for route in component.routes.keys():
+                # parameterized routes are visited with a sample value
+                pathnames.append(prefix + '/'.join('1' if part.startswith('<') else part for part in route.split('/')))
+            pathnames.append(prefix + '/not-found')
+    return pathnames
+
+
+def get_multiplexed_prop_ids(dependencies):
+    '''
+    Maps the proxy outputs of the Multiplexer transform of dash_extensions to the outputs they stand for.
+    The browser copies them with a clientside callback, which is emulated here; other clientside callbacks
+    are not run.
+    '''
+    proxies = {}
+    for dependency in dependencies:
+        if dependency['clientside_function'] is None or '.' not in dependency['output']:
+            continue
+        output = split_callback_id(dependency['output'])
+        if isinstance(output, list):
+            continue
+        for item in dependency['inputs']:
+            component_id = parse_id(item['id'])
+            if isinstance(component_id, dict) and component_id.get('id') == output['id'] and 'idx' in component_id:
+                proxies[get_prop_id(component_id, item['property'])] = get_prop_id(output['id'], output['property'])
+    return proxies
+
+
+def make_body(dependency, values, overrides, layout_ids):
+    '''
+    Request body of the callback. Wildcard ids are resolved against the dict ids of the layout, using the
+    first component matching the first MATCH input; returns None if no component matches.
+    '''
+    binding = {}
+    for item in dependency['inputs']:
+        pattern = parse_id(item['id'])
+        if is_wildcard(pattern) and ['MATCH'] in pattern.values():
+            component_id = next((component_id for component_id in layout_ids if matches(pattern, component_id)), None)
+            if component_id is None:
+                return None
+            binding = {key: component_id[key] for key, value in pattern.items() if value == ['MATCH']}
+            break
+
+    def resolve(item, with_value):
+        pattern = parse_id(item['id'])
+        pattern_prop_id = get_prop_id(pattern, item['property'])
+
+        def entry(component_id):
+            result = {'id': component_id, 'property': item['property']}
+            if with_value:
+                prop_id = get_prop_id(component_id, item['property'])
+                result['value'] = overrides.get(pattern_prop_id, overrides.get(prop_id, values.get(prop_id)))
+            return result
+
+        if not is_wildcard(pattern):
+            return entry(pattern)
+        pattern = {**pattern, **binding}
+        component_ids = [component_id for component_id in layout_ids if matches(pattern, component_id)]
+        if ['ALL'] in pattern.values() or ['ALLSMALLER'] in pattern.values():
+            return [entry(component_id) for component_id in component_ids]
+        return entry(component_ids[0] if component_ids else pattern)
+
+    outputs = split_callback_id(dependency['output'])
+    outputs = [output for output in outputs] if isinstance(outputs, list) else outputs
+    inputs = [resolve(item, True) for item in dependency['inputs']]
+    changed = [get_prop_id(entry['id'], entry['property'])
+               for item in inputs for entry in (item if isinstance(item, list) else [item])]
+    return {
+        'output': dependency['output'],
+        'outputs': [resolve(output, False) for output in outputs] if isinstance(outputs, list) else resolve(outputs, False),
+        'inputs': inputs,
+        'state': [resolve(item, True) for item in dependency['state']],
+        'changedPropIds': changed
+    }
+
+
+def reads(dependency, changed):
+    for item in dependency['inputs']:
+        pattern = parse_id(item['id'])
+        if is_wildcard(pattern):
+            if any(prop == item['property'] and matches(pattern, parse_id(component_id)) for component_id, prop in changed):
+                return True
+        elif (stringify_id(pattern), item['property']) in changed:
+            return True
+    return False
+
+
+def record_requests(wapp):
+    '''
+    Replays the app once like a browser, returning (name, method, path, body) tuples for the requests
+    that succeeded, and a dict with the status code of the requests that failed, by name.
+    '''
+    client = wapp.app.server.test_client()
+    requests = [('layout', 'GET', '/_dash-layout', None)]
+    failures = {}
+    values, layout_ids = {}, []
+    collect_layout_values(client.get('/_dash-layout').get_json(), values, layout_ids)
+    dependencies = client.get('/_dash-dependencies').get_json()
+    proxies = get_multiplexed_prop_ids(dependencies)
+    dependencies = [dependency for dependency in dependencies if dependency['clientside_function'] is None]
+
+    written = set()
+    for dependency in dependencies:
+        outputs = split_callback_id(dependency['output'])
+        for output in outputs if isinstance(outputs, list) else [outputs]:
+            prop_id = get_prop_id(parse_id(output['id']), output['property'])
+            written.add(proxies.get(prop_id, prop_id))
+
+    pathnames = get_route_pathnames(wapp)
+    queue = deque()
+    for index, dependency in enumerate(dependencies):
+        input_prop_ids = [get_prop_id(parse_id(item['id']), item['property']) for item in dependency['inputs']]
+        if all(prop_id in written for prop_id in input_prop_ids):
+            continue
+        overrides_list = [{}]
+        for item, prop_id in zip(dependency['inputs'], input_prop_ids):
+            if item['property'] == 'n_clicks':
+                overrides_list = [{**overrides, prop_id: 1} for overrides in overrides_list]
+            elif item['property'] == 'pathname' and pathnames:
+                overrides_list = [{**overrides, prop_id: pathname} for overrides in overrides_list for pathname in pathnames]
+        for overrides in overrides_list:
+            queue.append((index, overrides))
+
+    visits, names = {}, {}
+    while queue:
+        index, overrides = queue.popleft()
+        # callbacks reached several times (e.g. from several buttons) are recorded a few times at most
+        visits[index] = visits.get(index, 0) + 1
+        if visits[index] > 8:
+            continue
+        dependency = dependencies[index]
+        body = make_body(dependency, values, overrides, layout_ids)
+        if body is None or not body['changedPropIds']:
+            continue
+        response = client.post('/_dash-update-component', json=body)
+        first_input = dependency['inputs'][0]
+        name = HEX_ID_PATTERN.sub('', f'update {get_prop_id(parse_id(first_input["id"]), first_input["property"])}')
+        name += ''.join(f' {value}' for value in overrides.values() if isinstance(value, str))
+        names[name] = names.get(name, 0) + 1
+        if names[name] > 1:
+            name += f' #{names[name]}'
+        if response.status_code != 200:
+            failures[name] = response.status_code
+            continue
+        requests.append((name, 'POST', '/_dash-update-component', body))
+
+        changed = set()
+        for component_id, props in response.get_json().get('response', {}).items():
+            for prop, value in props.items():
+                prop_id = proxies.get(f'{component_id}.{prop}', f'{component_id}.{prop}')
+                values[prop_id] = value
+                changed.add(tuple(prop_id.rsplit('.', 1)))
+        for next_index, next_dependency in enumerate(dependencies):
+            if reads(next_dependency, changed):
+                queue.append((next_index, {}))
+    return requests, failures
+
+
+def send(client, method, path, body):
+    if method == 'GET':
+        return client.get(path)
+    return client.post(path, json=body)
+
+
+def measure(client, request, count, warmup, alloc_count):
+    _, method, path, body = request
+    for _ in range(warmup):
+        send(client, method, path, body)
+
+    # the p50 is the lowest median of ROUNDS rounds, which is less sensitive to the load of the machine
+    latencies, medians = [], []
+    for _ in range(ROUNDS):
+        round_latencies = []
+        for _ in range(max(1, count // ROUNDS)):
+            start = time.perf_counter()
+            send(client, method, path, body)
+            round_latencies.append(time.perf_counter() - start)
+        round_latencies.sort()
+        medians.append(round_latencies[len(round_latencies) // 2])
+        latencies += round_latencies
+    latencies.sort()
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_count):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            send(client, method, path, body)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+
+    return {
+        'rps': round(len(latencies) / sum(latencies), 1),
+        'p50_ms': round(min(medians) * 1000, 4),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 4),
+        'peak_kib': round(peaks[len(peaks) // 2] / 1024, 2)
+    }
+
+
+def calibrate():
+    '''
+    Lowest time, in milliseconds, of a fixed pure-Python workload (JSON round trips of a layout-like tree),
+    used to scale the latencies of a baseline recorded on another machine.
+    '''
+    tree = [{'type': 'Div', 'namespace': 'dash_html_components', 'props': {'id': f'id-{i}', 'children': list(range(20))}}
+            for i in range(200)]
+    timings = []
+    for _ in range(ROUNDS * 4):
+        start = time.perf_counter()
+        for _ in range(10):
+            json.loads(json.dumps(tree))
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 4)
+
+
+def compare(results, baseline, threshold):
+    '''
+    Regressions of results against baseline: failed requests, requests missing on either side, and gated
+    metrics above the baseline by more than threshold, with baseline latencies scaled by the calibrations.
+    Only the examples in results are compared.
+    '''
+    scale = 1.0
+    if baseline.get(CALIBRATION_KEY) and results.get(CALIBRATION_KEY):
+        scale = results[CALIBRATION_KEY] / baseline[CALIBRATION_KEY]
+    regressions = []
+    for example, requests in results.items():
+        if example == CALIBRATION_KEY:
+            continue
+        if example not in baseline:
+            regressions.append(f'{example}: not in the baseline')
+            continue
+        base_requests = baseline[example]
+        for name in list(requests) + [name for name in base_requests if name not in requests]:
+            metrics, base = requests.get(name), base_requests.get(name)
+            if metrics is None:
+                regressions.append(f'{example} {name}: in the baseline, not made')
+            elif 'error' in metrics:
+                regressions.append(f'{example} {name}: failed ({metrics["error"]})')
+            elif base is None:
+                regressions.append(f'{example} {name}: not in the baseline')
+            elif 'error' not in base:
+                for metric in GATED_METRICS:
+                    if base.get(metric, 0) <= 0:
+                        continue
+                    expected = base[metric] * (scale if metric.endswith('_ms') else 1.0)
+                    change = metrics[metric] / expected - 1
+                    if change > threshold:
+                        regressions.append(f'{example} {name} {metric}: {expected:.2f} -> {metrics[metric]:.2f} ({change:+.0%})')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP-level benchmark of the example apps.')
+    parser.add_argument('--examples', nargs='*', help='prefixes of the example files to run (default: all)')
+    parser.add_argument('--requests', type=int, default=200, help='timed repetitions of each request')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed repetitions of each request')
+    parser.add_argument('--alloc-requests', type=int, default=20, help='repetitions of each request under tracemalloc')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline file')
+    parser.add_argument('--update-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.5, help='relative increase flagged as a regression')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, os.path.join(HERE, '..'))
+
+    # calibrated before and after the examples, keeping the fastest, in case the machine was busy for a while
+    results = {CALIBRATION_KEY: calibrate()}
+    for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.py'))):
+        example = os.path.basename(path)
+        if example in SKIPPED_EXAMPLES or (args.examples and not any(example.startswith(prefix) for prefix in args.examples)):
+            continue
+        print(example)
+        results[example] = {}
+        try:
+            wapp = load_example(path)
+            requests, failures = record_requests(wapp)
+        except Exception as ex:
+            results[example]['load'] = {'error': f'{type(ex).__name__}: {ex}'}
+            print(f'    failed: {type(ex).__name__}: {ex}')
+            continue
+        client = wapp.app.server.test_client()
+        for request in requests:
+            metrics = measure(client, request, args.requests, args.warmup, args.alloc_requests)
+            results[example][request[0]] = metrics
+            print(f'    {request[0][:60]:<60} {metrics["rps"]:>8.0f} req/s  p50 {metrics["p50_ms"]:>7.2f} ms  '
+                  f'p99 {metrics["p99_ms"]:>7.2f} ms  {metrics["peak_kib"]:>8.1f} KiB')
+        for name, status in failures.items():
+            results[example][name] = {'error': f'status {status}'}
+            print(f'    {name[:60]:<60} failed: status {status}')
+    results[CALIBRATION_KEY] = min(results[CALIBRATION_KEY], calibrate())
+    print(f'calibration: {results[CALIBRATION_KEY]:.2f} ms')
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'baseline saved in {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'no baseline in {args.baseline}, run with --update-baseline to create it')
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f'{len(regressions)} regressions (threshold {args.threshold:.0%}):')
+        for regression in regressions:
+            print(f'    {regression}')
+        return 1
+    print(f'no regressions (threshold {args.threshold:.0%})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
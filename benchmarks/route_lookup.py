@@ -0,0 +1,53 @@
+'''
+Micro-benchmark for router path matching.
+
+Compares the compiled RouteTable (hash table + path trie) against the linear scan the routers used to do
+on every navigation. The compiled lookup time should stay flat as the number of routes grows.
+
+    python benchmarks/route_lookup.py
+'''
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from weaverlet.routing import RouteTable
+
+ROUTE_COUNTS = [10, 100, 1000, 10000]
+LOOKUPS = 20000
+PREFIX = '/app'
+
+
+def linear_scan(routes, prefix, pathname):
+    for route in routes:
+        if pathname == f'{prefix}{route}':
+            return route
+    return None
+
+
+def main():
+    print(f'{"routes":>8} {"linear (us)":>12} {"static (us)":>12} {"param (us)":>12} {"miss (us)":>12}')
+    for count in ROUTE_COUNTS:
+        routes = [f'/page_{i}' for i in range(count)] + [f'/item_{i}/<id>/detail' for i in range(count)]
+        table = RouteTable(routes, prefix=PREFIX)
+
+        last_static = f'{PREFIX}/page_{count - 1}'
+        last_param = f'{PREFIX}/item_{count - 1}/42/detail'
+        missing = f'{PREFIX}/does/not/exist'
+        assert table.match(last_static) == (f'/page_{count - 1}', {})
+        assert table.match(last_param) == (f'/item_{count - 1}/<id>/detail', {'id': '42'})
+        assert table.match(missing) == (None, None)
+
+        def per_lookup_us(stmt):
+            return timeit.timeit(stmt, number=LOOKUPS) / LOOKUPS * 1e6
+
+        linear = per_lookup_us(lambda: linear_scan(routes, PREFIX, last_static))
+        static = per_lookup_us(lambda: table.match(last_static))
+        param = per_lookup_us(lambda: table.match(last_param))
+        miss = per_lookup_us(lambda: table.match(missing))
+        print(f'{count:>8} {linear:>12.3f} {static:>12.3f} {param:>12.3f} {miss:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+'''
+Benchmark of StoreComponent updates: full-dict MERGE against delta PATCH.
+
+A one-key change is sent to a StoreComponent (browser-side, default mode) holding stores of several sizes.
+Requests go through the Flask test client, so the numbers include Dash request handling and serialization.
+With MERGE, the server round trips are the input_signal dispatch plus merge_signal, which uploads the whole
+store as State and returns it merged. With PATCH, only the dispatch round trip happens; the delta is applied
+in the browser by a clientside callback, whose cost is not measured here.
+
+    python benchmarks/store_delta.py
+'''
+import os
+import sys
+import json
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dash._utils import split_callback_id
+from weaverlet.base import WeaverletApp
+from weaverlet.components import StoreComponent, StoreComponentOp
+from weaverlet.delta import delta_set
+
+STORE_SIZES = [10, 100, 1000, 10000, 100000]
+REPETITIONS = 20
+
+
+def find_callback(dependencies, input_id):
+    for dependency in dependencies:
+        if dependency['clientside_function'] is None and any(i['id'] == input_id for i in dependency['inputs']):
+            return dependency
+    raise KeyError(input_id)
+
+
+def parse_output(output):
+    # multiplexed outputs have dict ids, serialized as JSON in the dependencies
+    component_id = output['id']
+    if component_id.startswith('{'):
+        component_id = json.loads(component_id)
+    return {'id': component_id, 'property': output['property']}
+
+
+def post(client, dependency, input_values, state_values=()):
+    outputs = split_callback_id(dependency['output'])
+    outputs = [parse_output(o) for o in outputs] if isinstance(outputs, list) else parse_output(outputs)
+    body = {
+        'output': dependency['output'],
+        'outputs': outputs,
+        'inputs': [dict(i, value=value) for i, value in zip(dependency['inputs'], input_values)],
+        'state': [dict(s, value=value) for s, value in zip(dependency['state'], state_values)],
+        'changedPropIds': [f'{dependency["inputs"][0]["id"]}.{dependency["inputs"][0]["property"]}']
+    }
+    data = json.dumps(body)
+    start = time.perf_counter()
+    response = client.post('/_dash-update-component', data=data, content_type='application/json')
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    return len(data) + len(response.data), elapsed, response.get_json()
+
+
+def main():
+    store = StoreComponent()
+    wapp = WeaverletApp(root_component=store)
+    client = wapp.app.server.test_client()
+    client.get('/')
+    dependencies = client.get('/_dash-dependencies').get_json()
+    dispatch = find_callback(dependencies, store.input_signal.signal_id)
+    merge = find_callback(dependencies, store._merge_signal.signal_id)
+
+    print(f'{"keys":>8} {"merge bytes":>12} {"patch bytes":>12} {"merge ms":>10} {"patch ms":>10}')
+    for size in STORE_SIZES:
+        current_data = {f'key_{i}': {'value': i, 'label': f'label {i}'} for i in range(size)}
+        merge_bytes, merge_times, patch_bytes, patch_times = 0, [], 0, []
+        for repetition in range(REPETITIONS):
+            change = {'value': repetition, 'label': 'changed'}
+
+            # MERGE: dispatch round trip, then merge_signal round trip with the whole store as State
+            dispatch_bytes, dispatch_time, _ = post(
+                client, dispatch, [{'op': StoreComponentOp.MERGE, 'data': {'key_0': change}}])
+            merge_signal_bytes, merge_signal_time, _ = post(
+                client, merge, [{'key_0': change}], [current_data])
+            merge_bytes = dispatch_bytes + merge_signal_bytes
+            merge_times.append(dispatch_time + merge_signal_time)
+
+            # PATCH: dispatch round trip only, carrying the delta
+            patch_bytes, patch_time, _ = post(
+                client, dispatch, [{'op': StoreComponentOp.PATCH, 'data': [delta_set(['key_0'], change)]}])
+            patch_times.append(patch_time)
+
+        print(f'{size:>8} {merge_bytes:>12} {patch_bytes:>12} {statistics.median(merge_times) * 1000:>10.2f} {statistics.median(patch_times) * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
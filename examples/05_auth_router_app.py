@@ -1,8 +1,12 @@
 from dash import html
 from dash_extensions.enrich import Output, Trigger
-from flask import session
 from weaverlet.base import WeaverletComponent, WeaverletApp, Identifier
 from weaverlet.components import AuthRouterComponent, RedirectComponent
+from weaverlet.session import UserSession
+from weaverlet.storage import MemoryBackend
+
+# the browser cookie only holds a session id, users are kept on the server
+user_session = UserSession(backend=MemoryBackend(ttl=3600))
 
 
 class LoginPageComponent(WeaverletComponent):
@@ -13,7 +17,8 @@ class LoginPageComponent(WeaverletComponent):
         super().__init__(**kwargs)
         self.redirect_component = RedirectComponent()
 
-    def get_layout(self, pathname, hash, href, search, protected_route):
+    def get_layout(self, pathname, hash, href, search, protected_route='/'):
+        # protected_route is not given when /login is visited directly
         self.protected_route = protected_route
         return html.Div(
             [
@@ -29,7 +34,7 @@ class LoginPageComponent(WeaverletComponent):
             Trigger(self.login_button_id, 'n_clicks')
         )
         def redirect_to_protected_route():
-            session['user'] = 'Omar'
+            user_session.login_user('Omar')
             return {'url': self.protected_route, 'target': '_self'}
 
 
@@ -61,7 +66,8 @@ routes = {
 }
 router_component = AuthRouterComponent(
     routes=routes,
-    not_found_page_component=not_found_page_component
+    not_found_page_component=not_found_page_component,
+    user_session=user_session
 )
 
 wapp = WeaverletApp(root_component=router_component)
@@ -29,6 +29,10 @@ class PrimaryNavbarComponent(WeaverletComponent):
 
 class MainPageComponent(WeaverletComponent):
 
+    # the layout depends neither on the URL nor on the session, so the router may cache it once for everyone
+    layout_cache_args = ()
+    layout_cache_per_session = False
+
     def __init__(self, brand, page_content_component):
         super().__init__()
         self.primary_navbar = PrimaryNavbarComponent(name='primary_navbar')
@@ -107,7 +111,8 @@ routes = {
 }
 router = SimpleRouterComponent(
     routes=routes,
-    not_found_page_component=not_found_page
+    not_found_page_component=not_found_page,
+    layout_cache_size=16
 )
 wapp = WeaverletApp(root_component=router,
                     title='Simple Weaverlet + DBC app',
@@ -0,0 +1,65 @@
+import random
+from dash import html
+from dash_extensions.enrich import Output, Input, Trigger
+from weaverlet.base import SignalOutput, WeaverletComponent, WeaverletApp, Identifier
+from weaverlet.components import StoreComponent, StoreComponentOp
+
+
+class StoreDemoComponent(WeaverletComponent):
+
+    store_button_id = Identifier()
+    merge_button_id = Identifier()
+    clean_button_id = Identifier()
+    label_p_id = Identifier()
+
+    def __init__(self, clientside=False, **kwargs):
+        super().__init__(**kwargs)
+        # with clientside=True, store operations run in the browser
+        self.store_component = StoreComponent(clientside=clientside)
+
+    def get_layout(self):
+        return html.Div(
+            [
+                self.store_component(),  # child component
+                html.Button('Store', id=self.store_button_id),
+                html.Button('Merge', id=self.merge_button_id),
+                html.Button('Clean', id=self.clean_button_id),
+                html.P(id=self.label_p_id)
+            ]
+        )
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            SignalOutput(self.store_component.input_signal),
+            Trigger(self.store_button_id, 'n_clicks')
+        )
+        def store():
+            return {'op': StoreComponentOp.STORE, 'data': {'a': random.random()}}
+
+        @app.callback(
+            SignalOutput(self.store_component.input_signal),
+            Trigger(self.merge_button_id, 'n_clicks')
+        )
+        def merge():
+            return {'op': StoreComponentOp.MERGE, 'data': {'b': random.random()}}
+
+        @app.callback(
+            SignalOutput(self.store_component.input_signal),
+            Trigger(self.clean_button_id, 'n_clicks')
+        )
+        def clean():
+            return {'op': StoreComponentOp.CLEAN}
+
+        @app.callback(
+            Output(self.label_p_id, 'children'),
+            Input(self.store_component.store_id, self.store_component.store_attr)
+        )
+        def show_store(data):
+            return f'Store contents: {data}'
+
+
+store_demo_component = StoreDemoComponent()
+
+wapp = WeaverletApp(root_component=store_demo_component)
+wapp.app.run_server(port=8089)
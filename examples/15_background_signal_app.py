@@ -0,0 +1,66 @@
+import time
+from dash import html
+from dash_extensions.enrich import Output, Trigger
+from weaverlet.base import SignalInput, SignalOutput, WeaverletComponent, WeaverletApp, Identifier
+from weaverlet.components import BackgroundSignalComponent
+from weaverlet.jobs import JobStatus
+
+
+def generate_report(job, steps):
+    # runs in a worker process; set_progress stops the job if it was cancelled
+    for step in range(steps):
+        job.set_progress(f'{step}/{steps}')
+        time.sleep(1)
+    return f'Report with {steps} sections'
+
+
+class ReportComponent(WeaverletComponent):
+
+    start_button_id = Identifier()
+    cancel_button_id = Identifier()
+    label_p_id = Identifier()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.report_signal = BackgroundSignalComponent(generate_report, poll_interval=500)
+
+    def get_layout(self):
+        return html.Div(
+            [
+                self.report_signal(),  # child component
+                html.Button('Generate report', id=self.start_button_id),
+                html.Button('Cancel', id=self.cancel_button_id),
+                html.P(id=self.label_p_id)
+            ]
+        )
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            SignalOutput(self.report_signal.input_signal),
+            Trigger(self.start_button_id, 'n_clicks')
+        )
+        def start():
+            return {'args': [10]}
+
+        @app.callback(
+            SignalOutput(self.report_signal.cancel_signal),
+            Trigger(self.cancel_button_id, 'n_clicks')
+        )
+        def cancel():
+            return {}
+
+        @app.callback(
+            Output(self.label_p_id, 'children'),
+            SignalInput(self.report_signal)
+        )
+        def show_report(job_state):
+            if job_state['status'] == JobStatus.DONE:
+                return job_state['result']
+            return f'{job_state["status"]} {job_state.get("progress") or ""}'
+
+
+report_component = ReportComponent()
+
+wapp = WeaverletApp(root_component=report_component)
+wapp.app.run_server(port=8089)
@@ -0,0 +1,68 @@
+from dash import html
+from dash_extensions.enrich import Output, Input
+from weaverlet.base import SignalOutput, SignalInput, WeaverletComponent, WeaverletApp, Identifier, ComponentArray
+from weaverlet.components import SignalComponent
+
+
+class CounterRowComponent(WeaverletComponent):
+
+    increment_button_id = Identifier()
+    label_p_id = Identifier()
+
+    def __init__(self, label, **kwargs):
+        super().__init__(**kwargs)
+        self.label = label
+        self.count_signal = SignalComponent()
+
+    def get_layout(self):
+        return html.Div(
+            [
+                self.count_signal(),  # child component
+                html.Button(f'Increment {self.label}', id=self.increment_button_id),
+                html.P(id=self.label_p_id)
+            ]
+        )
+
+    def register_callbacks(self, app):
+        # registered once, by the first row, for all the rows
+
+        @app.callback(
+            SignalOutput(self.count_signal),
+            Input(self.increment_button_id, 'n_clicks')
+        )
+        def increment(n_clicks):
+            return n_clicks
+
+        @app.callback(
+            Output(self.label_p_id, 'children'),
+            SignalInput(self.count_signal)
+        )
+        def show_count(count):
+            return f'Count: {count}'
+
+
+class CounterTableComponent(WeaverletComponent):
+
+    total_p_id = Identifier()
+
+    def __init__(self, rows, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = ComponentArray(CounterRowComponent(label=f'row {i}') for i in range(rows))
+
+    def get_layout(self):
+        return html.Div([html.P(id=self.total_p_id)] + [row() for row in self.rows])
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            Output(self.total_p_id, 'children'),
+            Input(self.rows.get_all_id(self.rows[0].count_signal.signal_id), 'data')
+        )
+        def update_total(counts):
+            return f'Total: {sum(count or 0 for count in counts)}'
+
+
+counter_table_component = CounterTableComponent(rows=1000)
+
+wapp = WeaverletApp(root_component=counter_table_component)
+wapp.app.run_server(port=8089)
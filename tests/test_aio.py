@@ -0,0 +1,50 @@
+import time
+import asyncio
+import threading
+import pytest
+from weaverlet.aio import AsyncCallbackRunner
+
+
+def test_timeout_covers_the_wait_for_a_free_slot():
+    runner = AsyncCallbackRunner(max_concurrency=1, timeout=0.2)
+    started = threading.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(0.15)
+        return 'slow'
+
+    async def quick():
+        return 'quick'
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(runner.run(slow())))
+    thread.start()
+    started.wait()
+    # the slot is free again before the timeout expires
+    assert runner.run(quick()) == 'quick'
+    thread.join()
+    assert results == ['slow']
+
+    async def stuck():
+        started.set()
+        await asyncio.sleep(10)
+
+    def run_stuck():
+        try:
+            results.append(runner.run(stuck()))
+        except Exception as e:
+            results.append(e)
+
+    started.clear()
+    results.clear()
+    thread = threading.Thread(target=run_stuck)
+    thread.start()
+    started.wait()
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        runner.run(quick())
+    assert time.perf_counter() - start < 1
+    thread.join()
+    # the exception raised in the thread is checked here, pytest does not see it otherwise
+    assert len(results) == 1 and isinstance(results[0], TimeoutError)
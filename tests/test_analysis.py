@@ -0,0 +1,93 @@
+from dash import html
+from dash_extensions.enrich import Input, Output
+from weaverlet.base import WeaverletComponent, WeaverletApp, ComponentsList, ComponentArray, Identifier
+
+
+class CounterComponent(WeaverletComponent):
+
+    button_id = Identifier()
+    label_id = Identifier()
+
+    def get_layout(self):
+        return html.Div([html.Button(id=self.button_id), html.P(id=self.label_id)])
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            Output(self.label_id, 'children'),
+            Input(self.button_id, 'n_clicks')
+        )
+        def update_label(n_clicks):
+            return n_clicks
+
+
+class TotalComponent(WeaverletComponent):
+
+    label_id = Identifier()
+
+    def __init__(self, counter):
+        super().__init__()
+        self.counter = counter
+
+    def get_layout(self):
+        return html.P(id=self.label_id)
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            Output(self.label_id, 'children'),
+            Input(self.counter.button_id, 'n_clicks')
+        )
+        def update_label(n_clicks):
+            return n_clicks
+
+
+class CountersList(ComponentsList):
+    def get_components(self):
+        return self
+
+
+class PageComponent(WeaverletComponent):
+
+    def __init__(self, counters):
+        super().__init__()
+        self.counters = counters
+
+    def get_layout(self):
+        return html.Div([counter() for counter in self.counters])
+
+
+class TwiceComponent(CounterComponent):
+
+    def register_callbacks(self, app):
+        super().register_callbacks(app)
+        super().register_callbacks(app)
+
+
+def test_callbacks_registered_twice_are_duplicates():
+    wapp = WeaverletApp(root_component=PageComponent(CountersList([TwiceComponent()])))
+    counter = wapp.root_component.counters[0]
+    graph = wapp.get_callback_graph()
+    assert graph.find_duplicates() == [[f'{counter.get_id()}.update_label'] * 2]
+    assert graph.find_array_candidates() == []
+
+
+def test_callbacks_registered_by_each_instance_are_array_candidates():
+    wapp = WeaverletApp(root_component=PageComponent(CountersList([CounterComponent(), CounterComponent()])))
+    counters = wapp.root_component.counters
+    graph = wapp.get_callback_graph()
+    assert graph.find_duplicates() == []
+    assert graph.find_array_candidates() == [
+        {'component_class': 'CounterComponent', 'callbacks': [f'{counter.get_id()}.update_label' for counter in counters]}]
+    assert 'ComponentArray candidates: 1' in graph.report()
+
+
+def test_callbacks_reading_other_components_are_not_array_candidates():
+    counter = CounterComponent()
+    wapp = WeaverletApp(root_component=PageComponent(CountersList([counter, TotalComponent(counter)])))
+    assert wapp.get_callback_graph().find_array_candidates() == []
+
+
+def test_component_array_registers_callbacks_once():
+    wapp = WeaverletApp(root_component=PageComponent(ComponentArray([CounterComponent(), CounterComponent()])))
+    assert wapp.get_callback_graph().find_array_candidates() == []
@@ -0,0 +1,59 @@
+import pytest
+from dash import html
+from dash_extensions.enrich import Output, Input
+from weaverlet.base import WeaverletComponent, WeaverletApp, WeaverletException, Identifier, SignalInput, SignalOutput, SignalBatch
+from weaverlet.components import SignalComponent
+
+
+class BatchComponent(WeaverletComponent):
+
+    button_id = Identifier()
+    label_id = Identifier()
+    title_id = Identifier()
+
+    def __init__(self, chained):
+        super().__init__()
+        self.chained = chained
+        self.first_signal = SignalComponent(name='first_signal')
+        self.second_signal = SignalComponent(name='second_signal')
+
+    def get_layout(self):
+        return html.Div([self.first_signal(), self.second_signal(), html.Button(id=self.button_id),
+                         html.P(id=self.label_id), html.P(id=self.title_id)])
+
+    def register_callbacks(self, app):
+        batch = SignalBatch(self.first_signal)
+
+        @app.callback(
+            SignalOutput(self.first_signal),
+            SignalOutput(self.second_signal),
+            Input(self.button_id, 'n_clicks')
+        )
+        def click(n_clicks):
+            return n_clicks, n_clicks
+
+        @app.callback(
+            Output(self.label_id, 'children'),
+            SignalInput(self.first_signal),
+            batch=batch
+        )
+        def update_label(value):
+            return value
+
+        @app.callback(
+            Output(self.title_id, 'children'),
+            Input(self.label_id, 'children') if self.chained else SignalInput(self.second_signal),
+            batch=batch
+        )
+        def update_title(value):
+            return value
+
+
+def test_batch_members_are_registered_as_one_callback():
+    wapp = WeaverletApp(root_component=BatchComponent(chained=False))
+    assert [spec.name for spec in wapp.callbacks.specs] == ['click', 'batch(update_label, update_title)']
+
+
+def test_batch_members_reading_outputs_of_each_other_are_refused():
+    with pytest.raises(WeaverletException, match='reads the output'):
+        WeaverletApp(root_component=BatchComponent(chained=True))
@@ -0,0 +1,103 @@
+import flask
+from dash import html
+from weaverlet.base import WeaverletComponent, WeaverletApp
+from weaverlet.components import SimpleRouterComponent, AuthRouterComponent
+from weaverlet.session import UserSession
+
+
+class SessionPageComponent(WeaverletComponent):
+
+    layout_cache_args = ()
+
+    def get_layout(self, pathname, hash, href, search):
+        return html.Div(f'Hello, {flask.session.get("name")}!')
+
+
+class SharedPageComponent(SessionPageComponent):
+
+    layout_cache_per_session = False
+
+
+class UserPageComponent(WeaverletComponent):
+
+    layout_cache_args = ()
+    layout_cache_per_session = False
+
+    def get_layout(self, pathname, hash, href, search, user):
+        return html.Div(f'Welcome, {user}!')
+
+
+class NotFoundComponent(WeaverletComponent):
+
+    def get_layout(self, pathname):
+        return html.Div('Not found')
+
+
+def make_client(wapp, **session):
+    client = wapp.app.server.test_client()
+    with client.session_transaction() as client_session:
+        client_session.update(session)
+    return client
+
+
+def visit(client, router, pathname):
+    response = client.post('/_dash-update-component', json={
+        'output': f'{router.content_id}.children',
+        'outputs': {'id': router.content_id, 'property': 'children'},
+        'inputs': [{'id': router.url_id, 'property': 'pathname', 'value': pathname}],
+        'state': [{'id': router.url_id, 'property': prop, 'value': None} for prop in ('hash', 'href', 'search')],
+        'changedPropIds': [f'{router.url_id}.pathname']})
+    return response.get_json()['response'][router.content_id]['children']['props']['children']
+
+
+def make_router_app(**routes):
+    router = SimpleRouterComponent(routes=routes, not_found_page_component=NotFoundComponent(), layout_cache_size=16)
+    wapp = WeaverletApp(root_component=router)
+    wapp.app.server.secret_key = 'test'
+    return router, wapp
+
+
+def test_cached_pages_are_kept_per_session():
+    router, wapp = make_router_app(**{'/': SessionPageComponent()})
+    assert visit(make_client(wapp, name='Ana'), router, '/') == 'Hello, Ana!'
+    assert visit(make_client(wapp, name='Omar'), router, '/') == 'Hello, Omar!'
+    assert len(router._layout_cache) == 2
+
+
+def test_pages_not_cached_per_session_are_shared():
+    router, wapp = make_router_app(**{'/': SharedPageComponent()})
+    assert visit(make_client(wapp, name='Ana'), router, '/') == 'Hello, Ana!'
+    assert visit(make_client(wapp, name='Omar'), router, '/') == 'Hello, Ana!'
+    assert len(router._layout_cache) == 1
+
+
+def test_cached_pages_are_kept_per_user():
+    router = AuthRouterComponent(
+        routes={'/': {'component': UserPageComponent(), 'login_required': True},
+                '/login': {'component': NotFoundComponent(), 'login_required': False}},
+        not_found_page_component=NotFoundComponent(), user_session=UserSession(), layout_cache_size=16)
+    wapp = WeaverletApp(root_component=router)
+    wapp.app.server.secret_key = 'test'
+    assert visit(make_client(wapp, user='Ana'), router, '/') == 'Welcome, Ana!'
+    assert visit(make_client(wapp, user='Omar'), router, '/') == 'Welcome, Omar!'
+    assert visit(make_client(wapp, user='Ana', theme='dark'), router, '/') == 'Welcome, Ana!'
+    # the page depends on the user only, so both sessions of Ana share its layout
+    assert len(router._layout_cache) == 2
+
+
+class ItemPageComponent(WeaverletComponent):
+
+    layout_cache_args = ()
+    layout_cache_per_session = False
+
+    def get_layout(self, pathname, hash, href, search, item_id):
+        return html.Div(f'Item {item_id}')
+
+
+def test_route_params_are_part_of_the_key():
+    router, wapp = make_router_app(**{'/item/<item_id>': ItemPageComponent()})
+    client = make_client(wapp)
+    assert visit(client, router, '/item/1') == 'Item 1'
+    assert visit(client, router, '/item/2') == 'Item 2'
+    assert visit(client, router, '/item/1') == 'Item 1'
+    assert len(router._layout_cache) == 2
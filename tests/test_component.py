@@ -0,0 +1,48 @@
+import pickle
+
+from weaverlet.base import WeaverletComponent, Identifier
+from weaverlet.components import SignalComponent
+
+
+class FirstComponent(WeaverletComponent):
+
+    first_id = Identifier()
+
+    def get_layout(self):
+        pass
+
+
+class SecondComponent(WeaverletComponent):
+
+    second_id = Identifier()
+
+    def get_layout(self):
+        pass
+
+
+class BothComponent(FirstComponent, SecondComponent):
+    pass
+
+
+def test_identifiers_from_several_bases():
+    component = BothComponent(name='both')
+    assert component.first_id == component.get_id() + '-first_id'
+    assert component.second_id == component.get_id() + '-second_id'
+    component.set_name('renamed')
+    assert component.first_id == component.get_id() + '-first_id'
+    assert component.second_id.endswith('-renamed-second_id')
+
+
+def test_built_in_components_accept_extra_attributes():
+    signal = SignalComponent()
+    signal.extra = 1
+    assert signal.extra == 1
+
+
+def test_components_pickle():
+    component = FirstComponent(name='first')
+    assert component.first_id
+    restored = pickle.loads(pickle.dumps(component))
+    assert restored.get_id() == component.get_id()
+    assert restored.first_id == component.first_id
+    assert restored.get_context() == {}
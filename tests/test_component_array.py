@@ -0,0 +1,96 @@
+import json
+import pytest
+from dash import html
+from dash.dependencies import MATCH, ALL
+from dash_extensions.enrich import Output, Input
+from weaverlet.base import WeaverletComponent, WeaverletApp, WeaverletException, Identifier, ComponentArray
+from weaverlet.components import SignalComponent
+
+
+class RowComponent(WeaverletComponent):
+
+    button_id = Identifier()
+    label_id = Identifier()
+
+    def __init__(self, label):
+        super().__init__()
+        self.label = label
+        self.signal = SignalComponent()
+
+    def get_layout(self):
+        return html.Div([self.signal(), html.Button(self.label, id=self.button_id), html.P(id=self.label_id)])
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            Output(self.label_id, 'children'),
+            Input(self.button_id, 'n_clicks')
+        )
+        def update_label(n_clicks):
+            member = self.get_parent().rows.get_triggered_member()
+            return member.label if member is not None else None
+
+
+class TableComponent(WeaverletComponent):
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def get_layout(self):
+        return html.Div([row() for row in self.rows])
+
+
+def make_table(labels):
+    return WeaverletApp(root_component=TableComponent(ComponentArray(RowComponent(label) for label in labels)))
+
+
+def test_members_get_dict_ids_made_from_the_template():
+    wapp = make_table(['a', 'b', 'c'])
+    rows = wapp.root_component.rows
+    template = rows[0]
+    for index, row in enumerate(rows):
+        assert row.button_id == {'type': template.get_id() + '-button_id', 'index': index}
+        # descendants of the members too
+        assert row.signal.signal_id == {'type': template.signal.get_id() + '-signal_id', 'index': index}
+        assert wapp.get_component(row.button_id) is row
+        assert wapp.get_component(row.signal.signal_id) is row.signal
+    assert rows.get_all_id(rows[2].label_id) == {'type': template.get_id() + '-label_id', 'index': ALL}
+
+
+def test_only_the_template_registers_callbacks():
+    wapp = make_table(['a', 'b', 'c'])
+    rows = wapp.root_component.rows
+    specs = [spec for spec in wapp.callbacks.specs if spec.name == 'update_label']
+    assert len(specs) == 1
+    assert specs[0].component is rows[0]
+    assert specs[0].outputs[0].component_id == {'type': rows[0].get_id() + '-label_id', 'index': MATCH}
+    # MATCH is only used while the template registers its callbacks
+    assert rows[1].label_id['index'] == 1
+
+
+def test_get_triggered_member():
+    wapp = make_table(['a', 'b', 'c'])
+    rows = wapp.root_component.rows
+    client = wapp.app.server.test_client()
+
+    def dash_id(component_id):
+        return json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+
+    output_id = {'type': rows[0].get_id() + '-label_id', 'index': ['MATCH']}
+    response = client.post('/_dash-update-component', json={
+        'output': dash_id(output_id) + '.children',
+        'outputs': {'id': rows[2].label_id, 'property': 'children'},
+        'inputs': [{'id': rows[2].button_id, 'property': 'n_clicks', 'value': 1}],
+        'changedPropIds': [dash_id(rows[2].button_id) + '.n_clicks']})
+    assert response.status_code == 200
+    assert response.get_json()['response'][dash_id(rows[2].label_id)]['children'] == 'c'
+
+
+class OtherRowComponent(RowComponent):
+    pass
+
+
+def test_members_must_have_the_same_structure():
+    with pytest.raises(WeaverletException, match='same structure'):
+        WeaverletApp(root_component=TableComponent(ComponentArray([RowComponent('a'), OtherRowComponent('b')])))
@@ -0,0 +1,55 @@
+import pytest
+from weaverlet.base import WeaverletException
+from weaverlet.delta import apply_delta, delta_set, delta_delete, delta_merge
+
+
+def test_set_copies_the_changed_path_only():
+    data = {'a': {'b': 1}, 'c': {'d': 2}}
+    result = apply_delta(data, [delta_set(['a', 'b'], 3)])
+    assert result == {'a': {'b': 3}, 'c': {'d': 2}}
+    assert data == {'a': {'b': 1}, 'c': {'d': 2}}
+    assert result['c'] is data['c']
+
+
+def test_set_creates_missing_dicts():
+    assert apply_delta(None, [delta_set(['a', 'b'], 1)]) == {'a': {'b': 1}}
+
+
+def test_delete():
+    data = {'a': {'b': 1, 'c': 2}}
+    assert apply_delta(data, [delta_delete(['a', 'b'])]) == {'a': {'c': 2}}
+    # missing keys and paths are ignored
+    assert apply_delta(data, [delta_delete(['a', 'x']), delta_delete(['x', 'y'])]) == data
+
+
+def test_merge():
+    data = {'a': {'b': 1, 'c': 2}}
+    assert apply_delta(data, [delta_merge(['a'], {'c': 3, 'd': 4})]) == {'a': {'b': 1, 'c': 3, 'd': 4}}
+    assert apply_delta(data, [delta_merge(['x'], {'y': 1})]) == {'a': {'b': 1, 'c': 2}, 'x': {'y': 1}}
+
+
+def test_merge_replaces_values_that_are_not_dicts():
+    data = {'a': 'text', 'b': [1, 2], 'c': None}
+    result = apply_delta(data, [delta_merge([key], {'d': 1}) for key in ('a', 'b', 'c')])
+    assert result == {'a': {'d': 1}, 'b': {'d': 1}, 'c': {'d': 1}}
+
+
+def test_lists():
+    data = {'a': [1, 2]}
+    # lists are values: set replaces them, and they are replaced by dicts along a path
+    assert apply_delta(data, [delta_set(['a'], [3])]) == {'a': [3]}
+    assert apply_delta(data, [delta_set(['a', 'b'], 1)]) == {'a': {'b': 1}}
+    assert apply_delta(data, [delta_delete(['a', 'b'])]) == data
+    assert data == {'a': [1, 2]}
+
+
+def test_changes_are_applied_in_order():
+    delta = [delta_set(['a'], {'b': 1}), delta_merge(['a'], {'c': 2}), delta_delete(['a', 'b'])]
+    assert apply_delta({}, delta) == {'a': {'c': 2}}
+
+
+def test_invalid_changes():
+    with pytest.raises(WeaverletException):
+        apply_delta({}, [delta_set([], 1)])
+    with pytest.raises(WeaverletException):
+        apply_delta({}, [{'op': 'append', 'path': ['a'], 'value': 1}])
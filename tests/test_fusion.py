@@ -0,0 +1,67 @@
+import pytest
+from dash import no_update
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from weaverlet.callbacks import CallbackSpec
+from weaverlet.fusion import fuse_signal_chains, FusedCallbackSpec
+
+SIGNAL_KEYS = {('signal', 'data')}
+
+
+def make_spec(function, *dependencies):
+    return CallbackSpec(None, dependencies, {}, function=function)
+
+
+def make_chain(first, second, *other_specs):
+    specs = [
+        make_spec(first, Output('signal', 'data'), Output('title', 'children'), Input('button', 'n_clicks')),
+        make_spec(second, Output('label', 'children'), Input('signal', 'data'), State('suffix', 'value')),
+        *other_specs]
+    return specs, fuse_signal_chains(specs, SIGNAL_KEYS)
+
+
+def call(fused_spec, *args):
+    return fused_spec.make_function([member.function for member in fused_spec.members])(*args)
+
+
+def test_chain_is_fused_and_the_signal_is_not_returned():
+    specs, fused_specs = make_chain(lambda n_clicks: (n_clicks, 'title'), lambda value, suffix: f'{value}{suffix}')
+    assert len(fused_specs) == 1 and isinstance(fused_specs[0], FusedCallbackSpec)
+    assert [(output.component_id, output.component_property) for output in fused_specs[0].outputs] == [
+        ('title', 'children'), ('label', 'children')]
+    assert call(fused_specs[0], 1, '!') == ['title', '1!']
+
+
+def test_no_update_in_the_middle_skips_the_rest_of_the_chain():
+    second_calls = []
+    _, fused_specs = make_chain(lambda n_clicks: (no_update, 'title'), lambda value, suffix: second_calls.append(value))
+    assert call(fused_specs[0], 1, '!') == ['title', no_update]
+    assert second_calls == []
+
+
+def test_prevent_update_in_the_middle_keeps_the_outputs_of_the_previous_members():
+    def second(value, suffix):
+        raise PreventUpdate
+
+    _, fused_specs = make_chain(lambda n_clicks: (n_clicks, 'title'), second)
+    assert call(fused_specs[0], 1, '!') == ['title', no_update]
+
+
+def test_nothing_to_update_prevents_the_update():
+    _, fused_specs = make_chain(lambda n_clicks: (no_update, no_update), lambda value, suffix: value)
+    with pytest.raises(PreventUpdate):
+        call(fused_specs[0], 1, '!')
+
+
+def test_signal_read_as_state_by_other_callbacks_is_returned():
+    reader = make_spec(lambda n_clicks, value: value, Output('other', 'children'), Input('other_button', 'n_clicks'), State('signal', 'data'))
+    _, fused_specs = make_chain(lambda n_clicks: (n_clicks, 'title'), lambda value, suffix: value, reader)
+    assert len(fused_specs) == 2
+    assert ('signal', 'data') in [(output.component_id, output.component_property) for output in fused_specs[0].outputs]
+    assert call(fused_specs[0], 1, '!') == [1, 'title', 1]
+
+
+def test_signal_read_as_input_by_other_callbacks_is_not_fused():
+    reader = make_spec(lambda value: value, Output('other', 'children'), Input('signal', 'data'))
+    specs, fused_specs = make_chain(lambda n_clicks: (n_clicks, 'title'), lambda value, suffix: value, reader)
+    assert fused_specs == specs
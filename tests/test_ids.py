@@ -0,0 +1,53 @@
+import hashlib
+from dash import html
+from weaverlet.base import WeaverletComponent, WeaverletApp, ComponentsList, Identifier
+
+
+class ItemComponent(WeaverletComponent):
+
+    label_id = Identifier()
+
+    def get_layout(self):
+        return html.P(id=self.label_id)
+
+
+class ItemsList(ComponentsList):
+    def get_components(self):
+        return self
+
+
+class ListComponent(WeaverletComponent):
+
+    def __init__(self, size):
+        super().__init__(name='list')
+        self.items = ItemsList(ItemComponent(name=f'item{i}') for i in range(size))
+
+    def get_layout(self):
+        return html.Div([item() for item in self.items])
+
+
+def build_ids(size=10):
+    wapp = WeaverletApp(root_component=ListComponent(size), deterministic_ids=True)
+    return [component.get_id() for component in wapp._components]
+
+
+def test_deterministic_ids_are_stable_across_builds():
+    ids = build_ids()
+    assert ids == build_ids()
+    assert len(set(ids)) == len(ids)
+    # random ids otherwise
+    assert WeaverletApp(root_component=ListComponent(10))._components[1].get_id() != ids[1]
+
+
+def test_deterministic_id_collisions_are_resolved_deterministically(monkeypatch):
+    # every unsalted key gets the same hex id
+    def get_colliding_hex_string(key, length):
+        if '#' not in key:
+            return '0' * length
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:length]
+
+    monkeypatch.setattr(WeaverletComponent, '_get_deterministic_hex_string', staticmethod(get_colliding_hex_string))
+    ids = build_ids()
+    assert ids[0].startswith('0000000-')
+    assert len({component_id.split('-')[0] for component_id in ids}) == len(ids)
+    assert ids == build_ids()
@@ -0,0 +1,78 @@
+from dash import html
+from weaverlet.base import WeaverletComponent, WeaverletApp, Identifier
+
+
+class LeafComponent(WeaverletComponent):
+
+    label_id = Identifier()
+
+    def get_layout(self):
+        return html.P(id=self.label_id)
+
+
+class ParentComponent(WeaverletComponent):
+
+    def initialize(self):
+        self.set_name('parent')
+        self.child = LeafComponent(name='late_child')
+
+    def get_layout(self):
+        return html.Div([self.child()])
+
+
+def test_indexes_see_names_and_children_set_by_initialize():
+    wapp = WeaverletApp(root_component=ParentComponent())
+    parent = wapp.root_component
+    assert wapp.get_components_by_name('parent') == [parent]
+    assert wapp.get_components_by_name('unnamed') == []
+    assert wapp.get_components_by_name('late_child') == [parent.child]
+    assert parent.child.get_parent() is parent
+    assert wapp.get_component(parent.child.label_id) is parent.child
+
+
+def test_indexes_follow_later_renames():
+    wapp = WeaverletApp(root_component=ParentComponent())
+    child = wapp.root_component.child
+    child.set_name('renamed')
+    assert wapp.get_components_by_name('late_child') == []
+    assert wapp.get_components_by_name('renamed') == [child]
+    assert wapp.get_component(child.label_id) is child
+
+
+class MidComponent(WeaverletComponent):
+
+    def initialize(self):
+        self.extra = LeafComponent(name='extra')
+
+    def get_layout(self):
+        return html.Div([self.extra()])
+
+
+class RootComponent(WeaverletComponent):
+
+    def __init__(self):
+        super().__init__(name='root')
+        self.mid = MidComponent(name='mid')
+
+    def get_layout(self):
+        return html.Div([self.mid()])
+
+
+def test_children_added_by_initialize_below_the_root():
+    wapp = WeaverletApp(root_component=RootComponent())
+    mid = wapp.root_component.mid
+    assert mid.get_parent() is wapp.root_component
+    assert mid.extra.get_parent() is mid
+    assert mid.get_children() == [mid.extra]
+    assert '_parent' not in MidComponent._child_slots
+    assert '_page_root' not in MidComponent._child_slots
+    assert wapp.get_components_by_name('extra') == [mid.extra]
+
+
+def test_renames_are_tracked_per_app():
+    wapp = WeaverletApp(root_component=ParentComponent())
+    other = WeaverletApp(root_component=RootComponent())
+    indexed_version = other._indexed_ids_version
+    wapp.root_component.child.set_name('renamed')
+    assert other._ids_version == indexed_version
+    assert wapp.get_components_by_name('renamed') == [wapp.root_component.child]
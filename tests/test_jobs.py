@@ -0,0 +1,135 @@
+import time
+import threading
+import pytest
+from dash import html
+from dash.exceptions import PreventUpdate
+from weaverlet.base import WeaverletComponent, WeaverletApp
+from weaverlet.components import BackgroundSignalComponent
+from weaverlet.jobs import JobQueue, JobStatus
+
+
+def add(job, a, b):
+    job.set_progress(0.5)
+    return a + b
+
+
+def wait_for(queue, job_id, statuses, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = queue.get_state(job_id)
+        if state is not None and state['status'] in statuses:
+            return state
+        time.sleep(0.01)
+    raise AssertionError(f'job {job_id} still {queue.get_state(job_id)}')
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(executor='thread', max_workers=1, directory=str(tmp_path))
+
+
+def test_job_runs_to_done(queue):
+    release = threading.Event()
+    progress_seen = threading.Event()
+
+    def job_function(job):
+        job.set_progress('half')
+        progress_seen.set()
+        release.wait(10)
+        return 'result'
+
+    job_id = queue.submit(job_function)
+    progress_seen.wait(10)
+    assert queue.get_state(job_id) == {'status': JobStatus.RUNNING, 'progress': 'half'}
+    release.set()
+    assert wait_for(queue, job_id, JobStatus.FINISHED) == {'status': JobStatus.DONE, 'result': 'result'}
+    queue.delete(job_id)
+    assert queue.get_state(job_id) is None
+
+
+def test_job_failure_is_reported(queue):
+    def job_function(job):
+        raise ValueError('bad input')
+
+    job_id = queue.submit(job_function)
+    assert wait_for(queue, job_id, JobStatus.FINISHED) == {'status': JobStatus.FAILED, 'error': 'ValueError: bad input'}
+
+
+def test_cancel_running_job(queue):
+    started = threading.Event()
+
+    def job_function(job):
+        started.set()
+        while True:
+            job.set_progress(None)
+            time.sleep(0.01)
+
+    job_id = queue.submit(job_function)
+    started.wait(10)
+    queue.cancel(job_id)
+    assert wait_for(queue, job_id, JobStatus.FINISHED)['status'] == JobStatus.CANCELLED
+
+
+def test_cancel_queued_job(queue):
+    release = threading.Event()
+    calls = []
+    running_id = queue.submit(lambda job: release.wait(10))
+    queued_id = queue.submit(lambda job: calls.append(job.job_id))
+    assert queue.get_state(queued_id) == {'status': JobStatus.QUEUED}
+    queue.cancel(queued_id)
+    release.set()
+    assert wait_for(queue, queued_id, JobStatus.FINISHED)['status'] == JobStatus.CANCELLED
+    assert wait_for(queue, running_id, JobStatus.FINISHED)['status'] == JobStatus.DONE
+    assert calls == []
+    # unknown jobs are ignored
+    queue.cancel('unknown')
+    assert queue.get_state('unknown') is None
+
+
+def test_process_executor(tmp_path):
+    queue = JobQueue(executor='process', max_workers=1, directory=str(tmp_path))
+    job_id = queue.submit(add, 1, b=2)
+    assert wait_for(queue, job_id, JobStatus.FINISHED) == {'status': JobStatus.DONE, 'result': 3}
+
+
+class JobPageComponent(WeaverletComponent):
+
+    def __init__(self, queue, job_function=add):
+        super().__init__()
+        self.background_signal = BackgroundSignalComponent(job_function, job_queue=queue)
+
+    def get_layout(self):
+        return html.Div([self.background_signal()])
+
+
+def test_background_signal_polls_the_job_until_it_is_finished(queue):
+    wapp = WeaverletApp(root_component=JobPageComponent(queue))
+    functions = {spec.name: spec.function for spec in wapp.callbacks.specs}
+
+    signal_data, job_id, interval_disabled = functions['start_job']({'args': [1], 'kwargs': {'b': 2}}, None)
+    assert signal_data == {'job_id': job_id, 'status': JobStatus.QUEUED, 'progress': None}
+    assert interval_disabled is False
+
+    wait_for(queue, job_id, JobStatus.FINISHED)
+    signal_data, stored_job_id, interval_disabled = functions['poll_job'](job_id, signal_data)
+    assert signal_data == {'job_id': job_id, 'status': JobStatus.DONE, 'result': 3}
+    assert (stored_job_id, interval_disabled) == (None, True)
+    # finished jobs are deleted once reported
+    assert queue.get_state(job_id) is None
+
+    with pytest.raises(PreventUpdate):
+        functions['start_job'](None, None)
+
+
+def test_background_signal_cancels_the_running_job(queue):
+    def job_function(job):
+        while True:
+            job.set_progress(None)
+            time.sleep(0.01)
+
+    wapp = WeaverletApp(root_component=JobPageComponent(queue, job_function))
+    functions = {spec.name: spec.function for spec in wapp.callbacks.specs}
+    _, job_id, _ = functions['start_job']({}, None)
+    wait_for(queue, job_id, (JobStatus.RUNNING,))
+    functions['cancel_job']({}, job_id)
+    assert wait_for(queue, job_id, JobStatus.FINISHED)['status'] == JobStatus.CANCELLED
@@ -0,0 +1,72 @@
+import gzip
+import flask
+import pytest
+from dash import html
+from weaverlet.base import WeaverletComponent, WeaverletApp
+from weaverlet.responses import PrecompressedResponse, brotli
+
+DATA = '{"items": [' + ', '.join(f'"item {i}"' for i in range(200)) + ']}'
+
+
+def make_response(precompressed, **headers):
+    with flask.Flask(__name__).test_request_context(headers=headers):
+        return precompressed.make_response()
+
+
+def test_gzip():
+    response = make_response(PrecompressedResponse(DATA), **{'Accept-Encoding': 'gzip, deflate'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.get_data()).decode('utf-8') == DATA
+
+
+@pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+def test_brotli_is_preferred():
+    response = make_response(PrecompressedResponse(DATA), **{'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()).decode('utf-8') == DATA
+
+
+def test_identity():
+    for headers in ({}, {'Accept-Encoding': 'identity'}, {'Accept-Encoding': 'gzip;q=0'}):
+        response = make_response(PrecompressedResponse(DATA), **headers)
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data(as_text=True) == DATA
+
+
+def test_small_bodies_are_not_compressed():
+    response = make_response(PrecompressedResponse('{}'), **{'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_etag_and_not_modified():
+    precompressed = PrecompressedResponse(DATA)
+    response = make_response(precompressed)
+    etag = response.headers['ETag']
+    assert etag == f'"{precompressed.etag}"'
+    assert PrecompressedResponse(DATA).etag == precompressed.etag
+    assert PrecompressedResponse(DATA + ' ').etag != precompressed.etag
+
+    response = make_response(precompressed, **{'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+    assert make_response(precompressed, **{'If-None-Match': '"other"'}).status_code == 200
+
+
+class LayoutComponent(WeaverletComponent):
+
+    def get_layout(self):
+        return html.Div([html.P(f'line {i}') for i in range(100)])
+
+
+def test_dash_layout_is_served_precompressed():
+    wapp = WeaverletApp(root_component=LayoutComponent())
+    client = wapp.app.server.test_client()
+    response = client.get('/_dash-layout', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'line 99' in gzip.decompress(response.get_data())
+    response = client.get('/_dash-layout', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
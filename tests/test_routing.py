@@ -0,0 +1,47 @@
+import pytest
+from weaverlet.base import WeaverletException
+from weaverlet.routing import RouteTable
+
+
+def test_static_routes():
+    table = RouteTable(['/', '/items'])
+    assert table.match('/') == ('/', {})
+    assert table.match('/items') == ('/items', {})
+
+
+def test_params_are_captured():
+    table = RouteTable(['/item/<item_id>', '/item/<item_id>/part/<part_id>'])
+    assert table.match('/item/42') == ('/item/<item_id>', {'item_id': '42'})
+    assert table.match('/item/42/part/7') == ('/item/<item_id>/part/<part_id>', {'item_id': '42', 'part_id': '7'})
+
+
+def test_static_routes_win_over_params():
+    table = RouteTable(['/item/<item_id>', '/item/new', '/<section>/<page>/list', '/item/<item_id>/edit'])
+    assert table.match('/item/new') == ('/item/new', {})
+    assert table.match('/item/1') == ('/item/<item_id>', {'item_id': '1'})
+    assert table.match('/item/1/edit') == ('/item/<item_id>/edit', {'item_id': '1'})
+    # static segments are tried first, and the walk backtracks to params when they lead nowhere
+    assert table.match('/item/1/list') == ('/<section>/<page>/list', {'section': 'item', 'page': '1'})
+
+
+def test_prefix():
+    table = RouteTable(['/', '/item/<item_id>'], prefix='/app')
+    assert table.match('/app/') == ('/', {})
+    assert table.match('/app/item/1') == ('/item/<item_id>', {'item_id': '1'})
+    assert table.match('/item/1') == (None, None)
+
+
+def test_not_found():
+    table = RouteTable(['/', '/item/<item_id>'])
+    assert table.match('/other') == (None, None)
+    assert table.match('/item/1/more') == (None, None)
+    # params do not match empty segments
+    assert table.match('/item/') == (None, None)
+    assert table.match(None) == (None, None)
+
+
+def test_conflicting_param_names():
+    with pytest.raises(WeaverletException, match='"item_id"'):
+        RouteTable(['/item/<item_id>', '/item/<id>/edit'])
+    with pytest.raises(WeaverletException, match='conflicts'):
+        RouteTable(['/item/<item_id>', '/item/<item_id>'])
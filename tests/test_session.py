@@ -0,0 +1,61 @@
+import flask
+from weaverlet.session import UserSession
+from weaverlet.storage import MemoryBackend, SQLiteBackend
+
+
+class CountingBackend(MemoryBackend):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get(self, key, ignore_expired=False):
+        self.calls.append('get')
+        return super().get(key, ignore_expired)
+
+    def has(self, key):
+        self.calls.append('has')
+        return super().has(key)
+
+    def set(self, key, value):
+        self.calls.append('set')
+        return super().set(key, value)
+
+
+def make_app():
+    app = flask.Flask(__name__)
+    app.secret_key = 'test'
+    return app
+
+
+def test_user_is_loaded_with_a_single_backend_read():
+    app = make_app()
+    backend = CountingBackend()
+    user_session = UserSession(backend=backend)
+    with app.test_request_context():
+        user_session.login_user('Ana')
+        cookie = dict(flask.session)
+    backend.calls.clear()
+
+    for _ in range(3):
+        with app.test_request_context():
+            flask.session.update(cookie)
+            assert user_session.is_logged_in()
+            assert user_session.get_user() == 'Ana'
+    assert backend.calls == ['get'] * 3
+
+
+def test_reading_a_session_does_not_write_it_on_every_request(tmp_path):
+    app = make_app()
+    backend = SQLiteBackend(path=str(tmp_path / 'sessions.sqlite'))
+    user_session = UserSession(backend=backend)
+    with app.test_request_context():
+        user_session.login_user('Ana')
+        cookie = dict(flask.session)
+    changes = backend._get_connection().total_changes
+
+    for _ in range(3):
+        with app.test_request_context():
+            flask.session.update(cookie)
+            assert user_session.get_user() == 'Ana'
+    assert backend._get_connection().total_changes == changes
@@ -0,0 +1,130 @@
+import os
+import pytest
+from dash import html
+from weaverlet.base import WeaverletComponent, WeaverletApp
+from weaverlet.components import StoreComponent
+from weaverlet.delta import delta_set
+from weaverlet.storage import StorageBackend, MemoryBackend, SignalCacheBackend, FileSystemBackend, SQLiteBackend
+
+
+class EmptyComponent(WeaverletComponent):
+
+    def get_layout(self):
+        return html.Div()
+
+
+class StoreAppComponent(WeaverletComponent):
+
+    def __init__(self, backend):
+        super().__init__()
+        self.store = StoreComponent(serverside_backend=backend)
+
+    def get_layout(self):
+        return html.Div([self.store()])
+
+
+BACKENDS = {
+    'memory': lambda tmp_path, **kwargs: MemoryBackend(**kwargs),
+    'signal_cache': lambda tmp_path, **kwargs: SignalCacheBackend(**kwargs),
+    'file_system': lambda tmp_path, **kwargs: FileSystemBackend(directory=str(tmp_path / 'store'), **kwargs),
+    'sqlite': lambda tmp_path, **kwargs: SQLiteBackend(path=str(tmp_path / 'store.sqlite'), **kwargs),
+}
+
+
+class Clock():
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize('backend_name', sorted(BACKENDS))
+def test_metrics_endpoint_reports_backend_stats(backend_name, tmp_path):
+    backend = BACKENDS[backend_name](tmp_path)
+    backend.set('key', {'value': 1})
+    backend.get('key')
+    backend.get('missing')
+
+    wapp = WeaverletApp(root_component=EmptyComponent(), metrics=True, serverside_backend=backend)
+    response = wapp.app.server.test_client().get('/_weaverlet/metrics')
+
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    labels = f'backend="{type(backend).__name__}"'
+    assert f'weaverlet_serverside_cache_hits_total{{{labels}}} 1' in text
+    assert f'weaverlet_serverside_cache_misses_total{{{labels}}} 1' in text
+
+
+def test_backends_must_implement_delete():
+
+    class IncompleteBackend(StorageBackend):
+
+        def get(self, key, ignore_expired=False):
+            return None
+
+        def set(self, key, value):
+            return True
+
+        def has(self, key):
+            return False
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+@pytest.mark.parametrize('backend_name', sorted(BACKENDS))
+def test_has_honours_ttl(backend_name, tmp_path):
+    clock = Clock()
+    backend = BACKENDS[backend_name](tmp_path, ttl=10, timer=clock)
+    backend.set('key', {'value': 1})
+    assert backend.has('key')
+    clock.now += 11
+    assert not backend.has('key')
+    assert backend.get('key') is None
+
+
+def test_file_system_backend_evicts_in_batches(tmp_path, monkeypatch):
+    backend = FileSystemBackend(directory=str(tmp_path / 'store'), max_entries=10)
+    scans = []
+    scan = backend._scan
+    monkeypatch.setattr(backend, '_scan', lambda: scans.append(None) or scan())
+    for i in range(31):
+        backend.set(f'key{i}', i)
+        # oldest first, regardless of the resolution of the file system timestamps
+        os.utime(backend._get_path(f'key{i}'), (i, i))
+    # 10 entries, then one eviction down to 9 every 2 writes instead of a scan on each write
+    assert len(scans) == 11
+    assert len(os.listdir(tmp_path / 'store')) == 9
+    assert backend.get('key30') == 30
+    assert backend.get('key0') is None
+
+
+@pytest.mark.parametrize('backend_name', sorted(BACKENDS))
+def test_store_merge_and_patch_fail_when_data_was_evicted(backend_name, tmp_path):
+    backend = BACKENDS[backend_name](tmp_path)
+    root = StoreAppComponent(backend)
+    store = root.store
+    wapp = WeaverletApp(root_component=root, serverside_backend=backend)
+    client = wapp.app.server.test_client()
+
+    def send(op, key):
+        return client.post('/_dash-update-component', json={
+            'output': f'{store.store_id}.data',
+            'outputs': {'id': store.store_id, 'property': 'data'},
+            'inputs': [{'id': store.input_signal.signal_id, 'property': 'data', 'value': op}],
+            'state': [{'id': store.store_id, 'property': 'data', 'value': key}],
+            'changedPropIds': [f'{store.input_signal.signal_id}.data']})
+
+    response = send({'op': 'store', 'data': {'a': 1}}, None)
+    key = response.get_json()['response'][store.store_id]['data']
+    response = send({'op': 'merge', 'data': {'b': 2}}, key)
+    key = response.get_json()['response'][store.store_id]['data']
+    assert backend.get(key) == {'a': 1, 'b': 2}
+
+    backend.delete(key)
+    assert send({'op': 'merge', 'data': {'c': 3}}, key).status_code == 500
+    assert send({'op': 'patch', 'data': [delta_set(['c'], 3)]}, key).status_code == 500
+    # STORE does not need the previous data
+    assert send({'op': 'store', 'data': {'c': 3}}, key).status_code == 200
@@ -0,0 +1,74 @@
+import os
+import asyncio
+import inspect
+import functools
+import threading
+from .logger import logger
+
+
+class AsyncCallbackRunner():
+    '''
+    Runs the callbacks defined with async def on an asyncio event loop shared by all the callbacks of the
+    process, in a background thread started on first use (and again in each forked worker). At most
+    max_concurrency coroutines run at the same time, the rest wait for their turn; a coroutine not done
+    timeout seconds after its callback was called, waiting for its turn included, is cancelled and its
+    callback fails with a TimeoutError.
+    '''
+
+    def __init__(self, max_concurrency=100, timeout=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._semaphore = None
+
+    def _get_loop(self):
+        with self._lock:
+            # a loop thread does not survive a fork, each process starts its own
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='weaverlet-async-callbacks', daemon=True)
+                thread.start()
+                self._semaphore = None
+                self._loop = loop
+                self._pid = os.getpid()
+                logger.info(
+                    f'[AsyncCallbackRunner._get_loop] event loop started in process {self._pid}')
+            return self._loop
+
+    async def _run_limited(self, coroutine):
+        async with self._semaphore:
+            return await coroutine
+
+    async def _run(self, coroutine):
+        # created within the loop, as asyncio primitives belong to the loop they are first used in
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            # the timeout covers the wait for the semaphore too
+            return await asyncio.wait_for(self._run_limited(coroutine), self.timeout)
+        finally:
+            # not started if the timeout expired while waiting for the semaphore
+            coroutine.close()
+
+    def run(self, coroutine, name='coroutine'):
+        future = asyncio.run_coroutine_threadsafe(self._run(coroutine), self._get_loop())
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f'{name} did not finish within {self.timeout} seconds.') from None
+
+    def wrap(self, spec, function):
+        '''
+        Callback wrapper (see CallbackRegistry.add_wrapper) turning async callbacks into regular functions.
+        '''
+        if not inspect.iscoroutinefunction(function):
+            return function
+
+        @functools.wraps(function)
+        def async_callback(*args):
+            return self.run(function(*args), name=f'Callback {spec.name}')
+
+        return async_callback
@@ -0,0 +1,265 @@
+import re
+import json
+from collections import defaultdict
+from .fusion import get_dependency_key
+
+
+def _get_key(dependency):
+    key = get_dependency_key(dependency)
+    if key is None:
+        # wildcard ids are dicts, not hashable
+        key = (json.dumps(dependency.component_id, sort_keys=True, default=str), dependency.component_property)
+    return key
+
+
+def _format_key(key):
+    return f'{key[0]}.{key[1]}'
+
+
+class CallbackGraph():
+    '''
+    Static analysis of the callbacks registered by a WeaverletApp. Callbacks are nodes; there is an edge
+    from A to B when an output of A is an input (or trigger) of B. Reports:
+    - chains: paths of callbacks starting at a callback fired by the browser (an input no callback writes),
+      with more than max_round_trips server-side callbacks, each of which is a request per user action;
+    - fan_out: outputs that are inputs of more than max_fan_out callbacks, so a change causes as many requests;
+    - cycles: groups of callbacks that trigger each other;
+    - duplicates: callbacks registered more than once with the same code and dependencies;
+    - array_candidates: callbacks each instance of a component class registers for its own ids, which a
+      ComponentArray would register once (see find_array_candidates);
+    - multi_writer_outputs: outputs written by several callbacks (e.g. through group=, as in StoreComponent).
+    '''
+
+    def __init__(self, specs, max_round_trips=2, max_fan_out=3):
+        self.specs = list(specs)
+        self.max_round_trips = max_round_trips
+        self.max_fan_out = max_fan_out
+
+        self.writers = defaultdict(list)
+        self.readers = defaultdict(list)
+        for index, spec in enumerate(self.specs):
+            for output in spec.outputs:
+                self.writers[_get_key(output)].append(index)
+            for input in spec.inputs:
+                self.readers[_get_key(input)].append(index)
+
+        self.successors = defaultdict(set)
+        for key, writer_indexes in self.writers.items():
+            for writer in writer_indexes:
+                self.successors[writer].update(self.readers.get(key, ()))
+
+    def get_label(self, index):
+        spec = self.specs[index]
+        return f'{spec.component.get_id()}.{spec.name}'
+
+    def _is_browser_fired(self, index):
+        return any(_get_key(input) not in self.writers for input in self.specs[index].inputs)
+
+    def find_cycles(self):
+        '''
+        Strongly connected components with more than one callback, or callbacks reading their own outputs
+        (Tarjan's algorithm, iterative).
+        '''
+        index_of, low, on_stack, stack, cycles = {}, {}, set(), [], []
+        counter = 0
+        for root in range(len(self.specs)):
+            if root in index_of:
+                continue
+            work = [(root, iter(sorted(self.successors[root])))]
+            index_of[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                advanced = False
+                for successor in successors:
+                    if successor not in index_of:
+                        index_of[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(sorted(self.successors[successor]))))
+                        advanced = True
+                        break
+                    if successor in on_stack:
+                        low[node] = min(low[node], index_of[successor])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.successors[node]:
+                        cycles.append(sorted(component))
+        return cycles
+
+    def find_chains(self):
+        '''
+        Longest path (in server-side callbacks) from each browser-fired callback, ignoring cycles.
+        Returns the paths longer than max_round_trips, longest first.
+        '''
+        cyclic = {index for cycle in self.find_cycles() for index in cycle}
+        longest = {}
+
+        def get_longest(start):
+            # iterative post-order over the acyclic part of the graph
+            stack = [(start, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node in longest:
+                    continue
+                successors = [successor for successor in self.successors[node] if successor not in cyclic]
+                if not expanded:
+                    stack.append((node, True))
+                    stack.extend((successor, False) for successor in successors if successor not in longest)
+                    continue
+                cost = 0 if self.specs[node].clientside else 1
+                best = max((longest[successor] for successor in successors), key=lambda path: path[0], default=(0, []))
+                longest[node] = (cost + best[0], [node] + best[1])
+            return longest[start]
+
+        chains = []
+        for index in range(len(self.specs)):
+            if index in cyclic or not self._is_browser_fired(index):
+                continue
+            round_trips, path = get_longest(index)
+            if round_trips > self.max_round_trips:
+                chains.append({'round_trips': round_trips, 'callbacks': [self.get_label(node) for node in path]})
+        chains.sort(key=lambda chain: -chain['round_trips'])
+        return chains
+
+    def find_fan_out(self):
+        fan_out = [{'dependency': _format_key(key), 'readers': [self.get_label(index) for index in indexes]}
+                   for key, indexes in self.readers.items() if len(indexes) > self.max_fan_out]
+        fan_out.sort(key=lambda item: -len(item['readers']))
+        return fan_out
+
+    def _get_functions(self, spec):
+        functions = [spec] if spec.members is None else spec.members
+        return tuple(getattr(member.function, '__code__', member.function) for member in functions)
+
+    def find_duplicates(self):
+        '''
+        Callbacks registered more than once with the same code and the same dependencies, each registration
+        making the same request.
+        '''
+        signatures = defaultdict(list)
+        for index, spec in enumerate(self.specs):
+            signature = (
+                self._get_functions(spec),
+                tuple((type(dependency).__name__,) + _get_key(dependency) for dependency in spec.outputs + spec.arguments))
+            signatures[signature].append(index)
+        return [[self.get_label(index) for index in indexes] for indexes in signatures.values() if len(indexes) > 1]
+
+    def find_array_candidates(self):
+        '''
+        Callbacks with the same code registered by several instances of a component class, with the same
+        dependencies once the component ids in them are replaced by their order of appearance in the callback,
+        i.e. each instance registering the callback for its own ids. A ComponentArray would register it once.
+        '''
+        from .base import COMPONENT_IDS_LENGTH
+        hex_id = re.compile(f'[0-9a-f]{{{COMPONENT_IDS_LENGTH}}}-')
+        signatures = defaultdict(list)
+        for index, spec in enumerate(self.specs):
+            hex_ids = {}
+
+            def normalize(component_id):
+                if isinstance(component_id, dict):
+                    return tuple(sorted((key, normalize(value)) for key, value in component_id.items()))
+                if isinstance(component_id, str) and hex_id.match(component_id):
+                    prefix = hex_ids.setdefault(component_id[:COMPONENT_IDS_LENGTH], f'#{len(hex_ids)}')
+                    return prefix + component_id[COMPONENT_IDS_LENGTH:]
+                return str(component_id)
+
+            signature = (
+                type(spec.component),
+                self._get_functions(spec),
+                tuple((type(dependency).__name__, normalize(dependency.component_id), dependency.component_property)
+                      for dependency in spec.outputs + spec.arguments))
+            signatures[signature].append(index)
+        return [{'component_class': signature[0].__name__, 'callbacks': [self.get_label(index) for index in indexes]}
+                for signature, indexes in signatures.items()
+                if len({id(self.specs[index].component) for index in indexes}) > 1]
+
+    def find_multi_writer_outputs(self):
+        return [{'dependency': _format_key(key),
+                 'writers': [self.get_label(index) for index in indexes],
+                 'groups': sorted({str(self.specs[index].kwargs.get('group')) for index in indexes})}
+                for key, indexes in self.writers.items() if len(indexes) > 1]
+
+    def to_dict(self):
+        return {
+            'callbacks': [
+                {'id': index, 'label': self.get_label(index), 'clientside': spec.clientside,
+                 'outputs': [_format_key(_get_key(dependency)) for dependency in spec.outputs],
+                 'inputs': [_format_key(_get_key(dependency)) for dependency in spec.inputs],
+                 'states': [_format_key(_get_key(dependency)) for dependency in spec.states]}
+                for index, spec in enumerate(self.specs)],
+            'chains': self.find_chains(),
+            'fan_out': self.find_fan_out(),
+            'cycles': [[self.get_label(index) for index in cycle] for cycle in self.find_cycles()],
+            'duplicates': self.find_duplicates(),
+            'array_candidates': self.find_array_candidates(),
+            'multi_writer_outputs': self.find_multi_writer_outputs()
+        }
+
+    def to_json(self, path=None):
+        data = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        return data
+
+    def to_dot(self, path=None):
+        '''
+        Graphviz description of the graph: callbacks are boxes (dashed for clientside callbacks), and edges
+        are labelled with the dependencies linking them. Callbacks in cycles are drawn in red.
+        '''
+        def quote(value):
+            return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+        cyclic = {index for cycle in self.find_cycles() for index in cycle}
+        lines = ['digraph callbacks {', '    rankdir=LR;', '    node [shape=box];']
+        for index, spec in enumerate(self.specs):
+            attributes = [f'label={quote(self.get_label(index))}']
+            if spec.clientside:
+                attributes.append('style=dashed')
+            if index in cyclic:
+                attributes.append('color=red')
+            lines.append(f'    cb{index} [{", ".join(attributes)}];')
+        for key, writer_indexes in self.writers.items():
+            for writer in writer_indexes:
+                for reader in self.readers.get(key, ()):
+                    lines.append(f'    cb{writer} -> cb{reader} [label={quote(_format_key(key))}];')
+        lines.append('}')
+        data = '\n'.join(lines) + '\n'
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        return data
+
+    def report(self):
+        data = self.to_dict()
+        lines = [f'{len(self.specs)} callbacks']
+        lines.append(f'chains with more than {self.max_round_trips} server round trips: {len(data["chains"])}')
+        lines += [f'  {chain["round_trips"]}: ' + ' -> '.join(chain['callbacks']) for chain in data['chains']]
+        lines.append(f'dependencies read by more than {self.max_fan_out} callbacks: {len(data["fan_out"])}')
+        lines += [f'  {item["dependency"]}: {len(item["readers"])} callbacks' for item in data['fan_out']]
+        lines.append(f'cycles: {len(data["cycles"])}')
+        lines += ['  ' + ', '.join(cycle) for cycle in data['cycles']]
+        lines.append(f'duplicate registrations: {len(data["duplicates"])}')
+        lines += ['  ' + ', '.join(duplicate) for duplicate in data['duplicates']]
+        lines.append(f'ComponentArray candidates: {len(data["array_candidates"])}')
+        lines += [f'  {item["component_class"]}: ' + ', '.join(item['callbacks']) for item in data['array_candidates']]
+        lines.append(f'outputs with several writers: {len(data["multi_writer_outputs"])}')
+        lines += [f'  {item["dependency"]}: ' + ', '.join(item['writers']) for item in data['multi_writer_outputs']]
+        return '\n'.join(lines)
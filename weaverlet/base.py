@@ -1,13 +1,30 @@
 from abc import ABC, abstractmethod
 import string
 import random
-from collections import OrderedDict
+import hashlib
+import json
+import threading
+from collections import OrderedDict, defaultdict
 from .logger import logger
+from .cache import LayoutCache, CACHE_MISS, make_layout_cache_key, layout_to_json
+from .profiler import StartupProfiler
+from .callbacks import CallbackRegistry
+from .metrics import CallbackMetrics, PROMETHEUS_CONTENT_TYPE
+from .fusion import fuse_signal_chains, get_signal_keys
+from .responses import make_json_response
+from .aio import AsyncCallbackRunner
+from .analysis import CallbackGraph
+from contextlib import nullcontext
+from dash import callback_context
+from dash.dependencies import MATCH, ALL
 from dash_extensions.enrich import Input, Output, Trigger, State, ServersideOutput
 from dash_extensions.enrich import Dash
 from jupyter_dash import JupyterDash
+import flask
 
 COMPONENT_IDS_LENGTH = 7
+# prefix of the instance attributes caching the values of the Identifiers
+IDENTIFIER_ATTRIBUTE_PREFIX = '_identifier_'
 DEFAULT_COMPONENT_NAME = 'unnamed'
 
 
@@ -29,6 +46,9 @@ def SignalState(signal):
 def SignalGroup(signal):
     return signal.signal_group_id
 
+def SignalBatch(signal):
+    return signal.signal_group_id
+
 
 
 class WeaverletException(Exception):
@@ -46,13 +66,155 @@ class DetatchedComponentRef(object):
         return getattr(self.component, attr)
 
 
+class ComponentsDict(dict, ABC):
+    @abstractmethod
+    def get_components():
+        pass
+
+
+class ComponentsList(list, ABC):
+    @abstractmethod
+    def get_components():
+        pass
+
+
+class ComponentsOrderedDict(OrderedDict, ABC):
+    @abstractmethod
+    def get_components():
+        pass
+
+
+class ComponentArray(ComponentsList):
+    '''
+    List of components of the same class and structure (e.g. the rows of a table), sharing their callbacks.
+    The Identifiers of the members and of their descendants are dict ids, {'type': ..., 'index': <position
+    of the member>}, and only the first member (the template) registers its callbacks, with MATCH as index,
+    so the number of callbacks does not depend on the number of members.
+
+    The callbacks of the template run for every member: they must depend on the member only through their
+    inputs and states, and use get_triggered_member() to get the member that triggered them. get_all_id()
+    gives the ids matching every member, for callbacks outside the array. ComponentArrays cannot be nested.
+    '''
+
+    def __init__(self, components=()):
+        super().__init__(components)
+        # True while the template registers its callbacks
+        self._matching = False
+
+    def get_components(self):
+        return self
+
+    def get_all_id(self, component_id):
+        '''
+        Id matching the given Identifier value (of any member or member descendant) in every member.
+        '''
+        return {**component_id, 'index': ALL}
+
+    def get_triggered_member(self):
+        '''
+        Member whose inputs triggered the running callback, or None.
+        '''
+        for item in callback_context.triggered:
+            component_id = item['prop_id'].rsplit('.', 1)[0]
+            if component_id.startswith('{'):
+                index = json.loads(component_id).get('index')
+                if isinstance(index, int) and 0 <= index < len(self):
+                    return self[index]
+        return None
+
+
+class Identifier():
+    '''
+    Dash id scoped to the component: <component id>-<attribute name>. Computed once per component, and kept
+    in the instance __dict__ until the id of the component changes (set_name() or a new hex id); components
+    declaring __slots__ without __dict__ compute it on each access. Components in a ComponentArray get dict
+    ids instead, see ComponentArray.
+    '''
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.attribute_name = IDENTIFIER_ATTRIBUTE_PREFIX + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.attribute_name)
+        except AttributeError:
+            pass
+        try:
+            component_id = instance._id
+            array_member = instance._array_member
+        except AttributeError:
+            raise TypeError(
+                'Component instance is missing the "_id" instance attribute.') from None
+        if array_member is not None:
+            array, index, counterpart = array_member
+            return {'type': counterpart.get_id() + '-' + self.name, 'index': MATCH if array._matching else index}
+        value = component_id + '-' + self.name
+        try:
+            object.__setattr__(instance, self.attribute_name, value)
+        except AttributeError:
+            # no __dict__
+            pass
+        return value
+
+    def __set__(self, instance, value):
+        raise TypeError(
+            'Cannot manually assign a value to an Identifier.')
+
+
 class WeaverletComponent(ABC):
 
+    # the attributes set on every component are slots, so large trees keep them out of the instance dicts;
+    # subclasses still get a __dict__ for their own attributes
+    __slots__ = ('_name', '_id', '_context', '_children', '_parent', '_page_root', '_array_member', '_layout_cache_invalidators', '_app')
+
+    # names of the layout arguments a page layout depends on; None means the layout is never cached by routers
+    layout_cache_args = None
+    # cached page layouts are kept per browser session unless the page sets this to False, declaring that
+    # its layout does not depend on the session (flask.session, the logged in user, ...)
+    layout_cache_per_session = True
+
+    # class-level registry of the attributes holding children (components or component containers),
+    # filled in automatically when such a value is assigned. Used as an ordered set.
+    _child_slots = {}
+    _identifier_attributes = ()
+
+    # bumped when any component is assigned a child, so that WeaverletApp notices children assigned by initialize()
+    _tree_version = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        child_slots = {}
+        for base in reversed(cls.__bases__):
+            child_slots.update(getattr(base, '_child_slots', {}))
+        for attr_name, attr in cls.__dict__.items():
+            if isinstance(attr, CHILD_TYPES):
+                child_slots[attr_name] = None
+        cls._child_slots = child_slots
+        cls._identifier_attributes = tuple(
+            IDENTIFIER_ATTRIBUTE_PREFIX + attr_name for attr_name in dir(cls) if isinstance(getattr(cls, attr_name, None), Identifier))
+
+    def __setattr__(self, name, value):
+        # the parent and page root set by WeaverletApp are not children
+        if isinstance(value, CHILD_TYPES) and name not in WeaverletComponent.__slots__:
+            child_slots = type(self)._child_slots
+            if name not in child_slots:
+                child_slots[name] = None
+            WeaverletComponent._tree_version += 1
+        super().__setattr__(name, value)
+
     def __init__(self, name=DEFAULT_COMPONENT_NAME):        
-        self._hex_id = self._get_random_hex_string(length=COMPONENT_IDS_LENGTH)
         self._name = name
-        self._set_id(self._hex_id, self._name)
-        self._context = {}
+        self._id = self._get_random_hex_string(length=COMPONENT_IDS_LENGTH) + '-' + self._name
+        # set by the WeaverletApp
+        self._context = None
+        # (array, index, template counterpart) for members of a ComponentArray and their descendants
+        self._array_member = None
+        self._layout_cache_invalidators = ()
+        # the WeaverletApp whose tree holds the component, told when its id changes
+        self._app = None
 
     def initialize(self):
         pass
@@ -71,6 +233,23 @@ class WeaverletComponent(ABC):
 
     def _set_id(self, hex_id, name):
         self._id = hex_id + '-' + name
+        self._clear_identifier_values()
+        if self._app is not None:
+            self._app._ids_version += 1
+
+    def _clear_identifier_values(self):
+        for attribute_name in type(self)._identifier_attributes:
+            try:
+                object.__delattr__(self, attribute_name)
+            except AttributeError:
+                pass
+
+    def _set_hex_id(self, hex_id):
+        self._set_id(hex_id, self._name)
+
+    def get_hex_id(self):
+        # the hex id is not kept apart from the id: <hex id>-<name>
+        return self._id[:len(self._id) - len(self._name) - 1]
 
     def get_id(self):
         return self._id
@@ -79,11 +258,16 @@ class WeaverletComponent(ABC):
         return self._name
 
     def set_name(self, name):
+        hex_id = self.get_hex_id()
         self._name = name
-        self._set_id(self._hex_id, self._name)
+        self._set_id(hex_id, self._name)
 
     def get_context(self):
-        return self._context
+        return self._context if self._context is not None else {}
+
+    def invalidate_layout_cache(self):
+        for invalidate in self._layout_cache_invalidators:
+            invalidate()
 
     @abstractmethod
     def get_layout(self):
@@ -98,207 +282,473 @@ class WeaverletComponent(ABC):
         logger.debug(
             f'[{type(self).__name__}.__call__] self = {self}')
         """
+        if StartupProfiler.active is not None:
+            with StartupProfiler.active.component(self, 'get_layout'):
+                return self.get_layout(*args, **kwargs)
         return self.get_layout(*args, **kwargs)
 
     @staticmethod
     def _get_random_hex_string(length):
         return ''.join(random.choice(string.hexdigits.lower()) for _ in range(length))
 
+    @staticmethod
+    def _get_deterministic_hex_string(key, length):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:length]
+
     def __str__(self):
         address = hex(id(self))
         return f'<{self.get_id()} of {type(self).__name__} at {address}>'
 
 
+CHILD_TYPES = (WeaverletComponent, ComponentsList, ComponentsDict, ComponentsOrderedDict)
+
+
 class RouterComponent(WeaverletComponent):
     """
-    just a label class.
+    Base class of the routers. Optionally keeps an LRU/TTL cache of rendered page layouts,
+    enabled by passing layout_cache_size.
     """
 
-    def __init__(self):
-        super().__init__()
-
+    # names of the positional arguments passed to page layouts
+    layout_arg_names = ('pathname', 'hash', 'href', 'search')
+    # layout arguments identifying the user, part of the layout cache keys even if the page does not list them
+    layout_identity_arg_names = ()
 
-class Identifier():
-
-    def __set_name__(self, owner, name):
-        self.name = name
-
-    def __get__(self, instance, owner):
-        if not '_id' in instance.__dict__:
-            raise TypeError(
-                'Component instance is missing the "_id" instance attribute.')
-        return instance._id + '-' + self.name
-
-    def __set__(self, instance, value):
-        raise TypeError(
-            'Cannot manually assign a value to an Identifier.')
-
-
-class ComponentsDict(dict, ABC):
-    @abstractmethod
-    def get_components():
-        pass
-
-
-class ComponentsList(list, ABC):
-    @abstractmethod
-    def get_components():
-        pass
+    def __init__(self, layout_cache_size=None, layout_cache_ttl=None):
+        super().__init__()
+        if layout_cache_size is not None:
+            self._layout_cache = LayoutCache(max_size=layout_cache_size, ttl=layout_cache_ttl)
+        else:
+            self._layout_cache = None
+
+    def invalidate_layout_cache(self, route=None):
+        if self._layout_cache is not None:
+            self._layout_cache.invalidate(route)
+
+    def _set_layout_cache_invalidators(self, route_components):
+        if self._layout_cache is None:
+            return
+        for route, component in route_components.items():
+            component._layout_cache_invalidators = \
+                (*component._layout_cache_invalidators, lambda route=route: self._layout_cache.invalidate(route))
+
+    def _render_page(self, route, component, *args, **params):
+        # params are the values matched in the route
+        if self._layout_cache is None:
+            return component(*args, **params)
+
+        layout_args = {**dict(zip(self.layout_arg_names, args)), **params}
+        identity = tuple(layout_args.get(arg_name) for arg_name in self.layout_identity_arg_names)
+        if component.layout_cache_per_session:
+            identity += (self._get_session_identity(),)
+        key = make_layout_cache_key(route, component, layout_args, identity, params)
+        if key is None:
+            return component(*args, **params)
+
+        layout = self._layout_cache.get(key)
+        if layout is CACHE_MISS:
+            # cached as JSON data, so the components are not converted again on each navigation
+            layout = layout_to_json(component(*args, **params))
+            self._layout_cache.set(key, layout)
+        return layout
+
+    def _get_session_identity(self):
+        # the Flask session cookie holds the session data, or the id of the server-side session (UserSession)
+        if not flask.has_request_context():
+            return None
+        cookie = flask.request.cookies.get(flask.current_app.config['SESSION_COOKIE_NAME'])
+        return hashlib.sha1(cookie.encode('utf-8')).hexdigest() if cookie is not None else None
 
 
-class ComponentsOrderedDict(OrderedDict, ABC):
-    @abstractmethod
-    def get_components():
-        pass
-
 class WeaverletApp():
 
-    def __init__(self, root_component, context={}, prevent_initial_callbacks=True, suppress_callback_exceptions=True, jupyter_mode=False, **kwargs):
+    def __init__(self, root_component, context={}, prevent_initial_callbacks=True, suppress_callback_exceptions=True, jupyter_mode=False, deterministic_ids=False, profile=False, metrics=False, metrics_route='_weaverlet/metrics', fuse_signal_chains=False, serverside_backend=None, precompress_layout=True, async_max_concurrency=100, async_timeout=None, **kwargs):
         self.root_component = root_component
-                
-        if jupyter_mode:
-            self.app = JupyterDash(**kwargs)
-        else:
-            self.app = Dash(**kwargs)        
-        
+        self.deterministic_ids = deterministic_ids
+        self.fuse_signal_chains = fuse_signal_chains
+        self.profiler = StartupProfiler() if profile else None
+        self.callbacks = CallbackRegistry()
+        self.metrics = CallbackMetrics() if metrics else None
+        # storage of the ServersideOutputs (and ServersideSignalOutputs) not setting a backend of their own
+        self.serverside_backend = serverside_backend
+
+        with self._profile_phase('create_dash_app'):
+            if jupyter_mode:
+                if serverside_backend is not None:
+                    raise WeaverletException(
+                        'serverside_backend is not supported in jupyter mode.')
+                self.app = JupyterDash(**kwargs)
+            elif serverside_backend is not None:
+                if 'output_defaults' in kwargs:
+                    raise WeaverletException(
+                        'serverside_backend and output_defaults cannot be used together.')
+                self.app = Dash(output_defaults=dict(backend=serverside_backend, session_check=True), **kwargs)
+            else:
+                self.app = Dash(**kwargs)
+
         self.context = context        
                 
         # configure Dash app
         self.app.config.prevent_initial_callbacks = prevent_initial_callbacks
         self.app.config.suppress_callback_exceptions = suppress_callback_exceptions
 
-        # set the children of each component in the component tree
+        # /_dash-layout is served from bytes serialized and compressed once
+        self._layout_response = None
+        self._layout_response_source = None
+        if precompress_layout:
+            self.app.server.view_functions[self.app.config.routes_pathname_prefix + '_dash-layout'] = self._serve_layout
+
+        # async def callbacks run on a shared event loop; this wrapper goes first, so the others see regular functions
+        self.async_runner = AsyncCallbackRunner(max_concurrency=async_max_concurrency, timeout=async_timeout)
+        self.callbacks.add_wrapper(self.async_runner.wrap)
+
+        if self.metrics is not None:
+            self.callbacks.add_wrapper(self.metrics.instrument)
+            self.app.server.add_url_rule(
+                self.app.config.routes_pathname_prefix + metrics_route,
+                endpoint='weaverlet_metrics',
+                view_func=self._serve_metrics)
+            if hasattr(serverside_backend, 'to_prometheus'):
+                self.metrics.collectors.append(serverside_backend.to_prometheus)
+
+        # bumped when a component of the tree changes its id, see _update_id_indexes()
+        self._ids_version = 0
+        self._indexed_ids_version = None
+        self._index_lock = threading.Lock()
+
+        # walk the component tree once, setting the children, parent, page root and context of each component
         logger.info(
-            '[WeaverletApp.__init__] finding children in components ...')
-        self._find_children_recursive(component=self.root_component, level=0)
-
-        # set the page root of each component in the component tree
-        logger.info(
-            '[WeaverletApp.__init__] setting page roots in components ...')
-        self.root_component._page_root = None
-        if isinstance(self.root_component, RouterComponent):
-            # each child here (including not_found_component and the login component if present) is a different page root
-            for child in self.root_component.get_children():
-                child._page_root = None
-                logger.info(
-                    f'[WeaverletApp.__init__] setting page root = {child} in components ...')
-                for grand_child in child.get_children():
-                    self._set_page_root_recursive(
-                        component=grand_child, page_root=child, level=0)
-        else:
-            for child in self.root_component.get_children():
-                self._set_page_root_recursive(
-                    component=child, page_root=self.root_component, level=0)
-
-        # set the parent of each component in the component tree
-        logger.info(
-            '[WeaverletApp.__init__] setting the parents in components ...')
-        self.root_component._parent = None
-        if isinstance(self.root_component, RouterComponent):
-            for child in self.root_component.get_children():
-                child._parent = None
-                logger.info(
-                    f'[WeaverletApp.__init__] setting parent = {child} in children components ...')
-                for grand_child in child.get_children():
-                    self._set_parent_recursive(
-                        component=grand_child, parent=child, level=0)
-        else:
-            for child in self.root_component.get_children():
-                self._set_parent_recursive(
-                    component=child, parent=self.root_component, level=0)
-
-        # set the context of each component in the component tree
-        logger.info(
-            '[WeaverletApp.__init__] setting the context in components ...')        
-        self._set_context_recursive(component=self.root_component, context=self.context, level=0)
+            '[WeaverletApp.__init__] building the component tree ...')
+        with self._profile_phase('build_component_tree'):
+            self._build_component_tree()
 
         # run initialize() for all componentes
         logger.info(
-            '[WeaverletApp.__init__] running initialize() in components ...')        
-        self._run_initialize_recursive(component=self.root_component, level=0)
+            '[WeaverletApp.__init__] running initialize() in components ...')
+        with self._profile_phase('initialize'):
+            self._run_initialize()
 
         # set the Dash app layout
         logger.info(
-            '[WeaverletApp.__init__] setting Dash app layout ...')        
-        self.app.layout = self.root_component()
+            '[WeaverletApp.__init__] setting Dash app layout ...')
+        with self._profile_phase('layout'):
+            self.app.layout = self._get_root_layout()
         #app.validation_layout = self.root_component()
 
         # run the register_callback method of each component in the component tree
         logger.info(
             '[WeaverletApp.__init__] registering callbacks in components ...')
-        self._register_callbacks_recursive(
-            self.app, component=self.root_component, level=0)
+        with self._profile_phase('register_callbacks'):
+            self._register_callbacks(self.app)
+
+        if self.profiler is not None:
+            logger.info(
+                f'[WeaverletApp.__init__] startup profile:\n{self.profiler.report()}')
+
+    def _get_root_layout(self):
+        StartupProfiler.active = self.profiler
+        try:
+            return self.root_component()
+        finally:
+            StartupProfiler.active = None
+
+    def _index_components(self):
+        # built aside and swapped in, so lookups running in other threads never see a partial index
+        ids_version = self._ids_version
+        components_by_hex_id = {}
+        components_by_id = {}
+        components_by_name = defaultdict(list)
+        components_by_class = defaultdict(list)
+        components_by_page_root = defaultdict(list)
+        components_by_array_member = {}
+        for component in self._components:
+            if component._array_member is not None:
+                _, index, counterpart = component._array_member
+                components_by_array_member[(id(counterpart), index)] = component
+            components_by_hex_id[component.get_hex_id()] = component
+            components_by_id[component.get_id()] = component
+            components_by_name[component.get_name()].append(component)
+            components_by_class[type(component)].append(component)
+            components_by_page_root[id(component.get_page_root())].append(component)
+        self._components_by_hex_id = components_by_hex_id
+        self._components_by_id = components_by_id
+        self._components_by_name = components_by_name
+        self._components_by_class = components_by_class
+        self._components_by_page_root = components_by_page_root
+        self._components_by_array_member = components_by_array_member
+        self._indexed_ids_version = ids_version
+
+    def _update_id_indexes(self):
+        # a component was renamed (set_name()) or given another hex id since the indexes were built
+        if self._ids_version != self._indexed_ids_version:
+            with self._index_lock:
+                if self._ids_version != self._indexed_ids_version:
+                    self._index_components()
+
+    def get_component(self, component_id):
+        '''
+        Returns the component with the given id, or owning the given Dash id (the value of one of its
+        Identifiers, as seen in callback_context), or None. Dict ids (pattern-matching or multiplexed
+        outputs) are resolved through their string values.
+        '''
+        self._update_id_indexes()
+        if isinstance(component_id, dict):
+            index = component_id.get('index')
+            if isinstance(component_id.get('type'), str) and isinstance(index, int):
+                # ComponentArray ids are made from the id of the template counterpart
+                counterpart = self.get_component(component_id['type'])
+                component = self._components_by_array_member.get((id(counterpart), index))
+                if component is not None:
+                    return component
+            for value in component_id.values():
+                component = self.get_component(value) if isinstance(value, (str, dict)) else None
+                if component is not None:
+                    return component
+            return None
+        if not isinstance(component_id, str):
+            return None
+        component = self._components_by_id.get(component_id)
+        if component is not None:
+            return component
+        component = self._components_by_hex_id.get(component_id[:COMPONENT_IDS_LENGTH])
+        if component is not None and component_id.startswith(component.get_id() + '-'):
+            return component
+        return None
+
+    def get_components_by_name(self, name):
+        self._update_id_indexes()
+        return list(self._components_by_name.get(name, ()))
+
+    def get_components_by_class(self, cls, subclasses=True):
+        if not subclasses:
+            return list(self._components_by_class.get(cls, ()))
+        return [component for component_cls, components in self._components_by_class.items()
+                if issubclass(component_cls, cls) for component in components]
+
+    def get_page_components(self, page_root):
+        '''
+        Returns the components whose page root is page_root (None for the root component, and for the pages
+        when the root component is a router), in tree order.
+        '''
+        return list(self._components_by_page_root.get(id(page_root), ()))
+
+    def get_callback_graph(self, max_round_trips=2, max_fan_out=3):
+        '''
+        Static analysis of the registered callbacks (see weaverlet.analysis.CallbackGraph), e.g.
+        print(wapp.get_callback_graph().report()) or wapp.get_callback_graph().to_dot('callbacks.dot').
+        '''
+        return CallbackGraph(self.callbacks.specs, max_round_trips=max_round_trips, max_fan_out=max_fan_out)
+
+    def get_wsgi_app(self):
+        '''
+        Returns the Flask server, fully set up, e.g. for WSGI servers forking workers after loading the app
+        (gunicorn --preload 'module:wapp.get_wsgi_app()').
+        '''
+        from .serving import prepare_server
+        return prepare_server(self)
+
+    def serve(self, host='127.0.0.1', port=8050, workers=None, post_fork=(), **kwargs):
+        '''
+        Serves the app with several worker processes sharing the component tree, see weaverlet.serving.PreforkServer.
+        '''
+        from .serving import PreforkServer
+        PreforkServer(self, host=host, port=port, workers=workers, post_fork=post_fork, **kwargs).serve()
+
+    def _serve_layout(self):
+        if self.app._layout_is_function:
+            return self.app.serve_layout()
+        if self._layout_response is None or self._layout_response_source is not self.app.layout:
+            self._layout_response_source = self.app.layout
+            self._layout_response = make_json_response(self.app._layout_value())
+        return self._layout_response.make_response()
+
+    def _serve_metrics(self):
+        return flask.Response(self.metrics.to_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    def _profile_phase(self, name):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(name)
+
+    def _profile_component(self, component, method):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.component(component, method)
 
     @staticmethod
     def _find_children(component):
-        children = []
-        for attr_name in dir(component):
-            attr = getattr(component, attr_name)
-            if isinstance(attr, ComponentsList):
-                children += attr.get_components()
-            elif isinstance(attr, ComponentsDict):
-                children += attr.get_components()
-            elif isinstance(attr, ComponentsOrderedDict):
-                children += attr.get_components()
-            elif isinstance(attr, WeaverletComponent):
-                children.append(attr)
-            
-        return children
-
-    def _find_children_recursive(self, component, level):
-        log_string = '[WeaverletApp._find_children_recursive] ' + \
-            '\t'*level + f'Setting children for {component}'
-        logger.info(log_string)
-
-        component._children = self._find_children(component)
-        for child in component.get_children():
-            self._find_children_recursive(child, level+1)
-
-    def _set_page_root_recursive(self, component, page_root, level):
-        log_string = '[WeaverletApp._set_page_root_recursive] ' + \
-            '\t'*level + f'Setting page root for {component}'
-        logger.info(log_string)
-
-        component._page_root = page_root
-        for child in component.get_children():
-            self._set_page_root_recursive(child, page_root, level+1)
-
-    def _set_parent_recursive(self, component, parent, level):
-        log_string = '[WeaverletApp._set_parent_recursive] ' + \
-            '\t'*level + f'Setting the parent for {component}'
-        logger.info(log_string)
+        return [child for _, child in WeaverletApp._find_child_slots(component)]
 
-        component._parent = parent
-        for child in component.get_children():
-            self._set_parent_recursive(child, component, level+1)
-
-    def _register_callbacks_recursive(self, app, component, level):
-
-        log_string = '[WeaverletApp._register_callbacks_recursive] ' + \
-            '\t'*level + f'Registering callbacks for {component}'
-        logger.info(log_string)
-
-        component.register_callbacks(app)
-        for child in component.get_children():
-            self._register_callbacks_recursive(app, child, level+1)
-
-    def _set_context_recursive(self, component, context, level):
-
-        log_string = '[WeaverletApp._set_context_recursive] ' + \
-            '\t'*level + f'Setting context for {component}'
-        logger.info(log_string)
+    @staticmethod
+    def _find_child_slots(component):
+        """
+        Returns (slot, child) pairs, where slot is the attribute name of the child,
+        followed by its position for children held in component containers.
+        """
+        child_slots = []
+        for attr_name in type(component)._child_slots:
+            attr = getattr(component, attr_name, None)
+            if isinstance(attr, (ComponentsList, ComponentsDict, ComponentsOrderedDict)):
+                child_slots += [(f'{attr_name}[{index}]', child) for index, child in enumerate(attr.get_components())]
+            elif isinstance(attr, WeaverletComponent):
+                child_slots.append((attr_name, attr))
 
-        component._context = context
-        for child in component.get_children():
-            self._set_context_recursive(child, context, level+1)
+        return child_slots
 
-    def _run_initialize_recursive(self, component, level):
+    def _assign_hex_id(self, component, path, hex_ids):
+        """
+        Gives the component a hex id not used by any other component in the tree. With deterministic_ids,
+        the id is derived from the position of the component in the tree and its name, so that every
+        process building the same tree gets the same ids; collisions are resolved deterministically.
+        """
+        if self.deterministic_ids:
+            key = f'{path}:{type(component).__name__}:{component.get_name()}'
+            hex_id = component._get_deterministic_hex_string(key, COMPONENT_IDS_LENGTH)
+            salt = 0
+            while hex_id in hex_ids:
+                salt += 1
+                hex_id = component._get_deterministic_hex_string(f'{key}#{salt}', COMPONENT_IDS_LENGTH)
+            component._set_hex_id(hex_id)
+        else:
+            while component.get_hex_id() in hex_ids:
+                logger.info(
+                    f'[WeaverletApp._assign_hex_id] duplicate id found for {component}, generating a new one')
+                component._set_hex_id(component._get_random_hex_string(length=COMPONENT_IDS_LENGTH))
+        hex_ids[component.get_hex_id()] = component
 
-        log_string = '[WeaverletApp._run_initialize_recursive] ' + \
-            '\t'*level + f'Running initialize() for {component}'
-        logger.info(log_string)
-        
-        component.initialize()
+    def _build_component_tree(self):
+        """
+        Iterative depth-first walk of the component tree. Components reachable through several paths
+        (e.g. a page shared by two routes) are visited only once, the first time they are reached.
+        Raises WeaverletException if the tree contains a cycle.
+        """
+        self._components = []
+        visited = set()
+        on_path = set()
+        hex_ids = {}
+        root_is_router = isinstance(self.root_component, RouterComponent)
+
+        stack = [(self.root_component, None, None, '', 0, False)]
+        while stack:
+            component, parent, page_root, path, level, leaving = stack.pop()
+            if leaving:
+                on_path.discard(id(component))
+                continue
+            if id(component) in on_path:
+                raise WeaverletException(
+                    f'Cycle detected in the component tree: {component} is its own descendant. Use DetatchedComponentRef to reference it.')
+            if id(component) in visited:
+                continue
+            visited.add(id(component))
+            on_path.add(id(component))
+
+            self._assign_hex_id(component, path, hex_ids)
+
+            log_string = '[WeaverletApp._build_component_tree] ' + \
+                '\t'*level + f'Setting children, parent, page root and context for {component}'
+            logger.info(log_string)
+
+            component._app = self
+            child_slots = self._find_child_slots(component)
+            component._children = [child for _, child in child_slots]
+            component._parent = parent
+            component._page_root = page_root
+            component._context = self.context
+            self._components.append(component)
+
+            if component is self.root_component:
+                # with a router as root, each child (including not_found_component and the login component if present) is a different page root
+                child_parent = None if root_is_router else component
+                child_page_root = None if root_is_router else component
+            else:
+                child_parent = component
+                child_page_root = page_root if page_root is not None else component
+
+            stack.append((component, None, None, path, level, True))
+            for slot, child in reversed(child_slots):
+                stack.append((child, child_parent, child_page_root, f'{path}/{slot}', level+1, False))
+
+        self._assign_array_members()
+
+    def _assign_array_members(self):
+        """
+        Pairs each member of the ComponentArrays in the tree, and each of its descendants, with its counterpart
+        in the first member of the array (the template). Raises WeaverletException if the members do not
+        have the same structure, or if arrays are nested.
+        """
+        for component in self._components:
+            for attr_name in type(component)._child_slots:
+                array = getattr(component, attr_name, None)
+                if not isinstance(array, ComponentArray) or not array:
+                    continue
+                template = array[0]
+                for index, member in enumerate(array):
+                    stack = [(member, template)]
+                    while stack:
+                        descendant, counterpart = stack.pop()
+                        if type(descendant) is not type(counterpart) or len(descendant._children) != len(counterpart._children):
+                            raise WeaverletException(
+                                f'Members of a ComponentArray must have the same structure: {descendant} does not match {counterpart}.')
+                        if descendant._array_member is not None:
+                            raise WeaverletException(
+                                f'{descendant} is in several ComponentArrays, ComponentArrays cannot be nested or shared.')
+                        descendant._array_member = (array, index, counterpart)
+                        # Identifiers read before now hold string ids
+                        descendant._clear_identifier_values()
+                        stack.extend(zip(descendant._children, counterpart._children))
+
+    def _run_initialize(self):
+        """
+        Runs initialize() for all the components. When initialize() assigns children to a component, the
+        tree is walked again and the new components are initialized too. The component indexes are built
+        afterwards, so they see the names set and the children added by initialize().
+        """
+        initialized = set()
+        while True:
+            tree_version = WeaverletComponent._tree_version
+            for component in self._components:
+                if id(component) in initialized:
+                    continue
+                initialized.add(id(component))
+                logger.info(
+                    f'[WeaverletApp._run_initialize] Running initialize() for {component}')
+                with self._profile_component(component, 'initialize'):
+                    component.initialize()
+            if WeaverletComponent._tree_version == tree_version:
+                break
+            logger.info(
+                '[WeaverletApp._run_initialize] children assigned in initialize(), walking the component tree again ...')
+            for component in self._components:
+                component._array_member = None
+            self._build_component_tree()
+        self._index_components()
+
+    def _register_callbacks(self, app):
+        for component in self._components:
+            array_member = component._array_member
+            if array_member is not None and array_member[1] != 0:
+                # the callbacks of the template of the ComponentArray match every member
+                continue
+            logger.info(
+                f'[WeaverletApp._register_callbacks] Registering callbacks for {component}')
+            if array_member is not None:
+                array_member[0]._matching = True
+            try:
+                with self._profile_component(component, 'register_callbacks'):
+                    component.register_callbacks(self.callbacks.get_component_app(app, component))
+            finally:
+                if array_member is not None:
+                    array_member[0]._matching = False
+
+        # callbacks declared with the same batch= are registered as one callback
+        from .batching import batch_callbacks
+        self.callbacks.specs = batch_callbacks(self.callbacks.specs)
+
+        if self.fuse_signal_chains:
+            logger.info(
+                '[WeaverletApp._register_callbacks] fusing signal chains ...')
+            self.callbacks.specs = fuse_signal_chains(self.callbacks.specs, get_signal_keys(self._components))
 
-        for child in component.get_children():
-            self._run_initialize_recursive(child, level+1)
\ No newline at end of file
+        logger.info(
+            f'[WeaverletApp._register_callbacks] registering {len(self.callbacks.specs)} callbacks in the Dash app')
+        self.callbacks.register(app)
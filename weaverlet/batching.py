@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from dash import callback_context, no_update
+from dash.exceptions import PreventUpdate
+from dash._utils import stringify_id
+from dash_extensions.enrich import Input, Trigger
+from .base import WeaverletException
+from .callbacks import CallbackSpec
+from .fusion import get_dependency_key
+from .logger import logger
+
+BATCH_KWARG = 'batch'
+
+
+def _is_no_update(value):
+    return isinstance(value, type(no_update))
+
+
+def _get_prop_id(dependency):
+    return f'{stringify_id(dependency.component_id)}.{dependency.component_property}'
+
+
+def _dependency_key(dependency):
+    # wildcard ids are dicts, not hashable
+    key = get_dependency_key(dependency)
+    return key if key is not None else (stringify_id(dependency.component_id), dependency.component_property)
+
+
+class BatchedCallbackSpec(CallbackSpec):
+    '''
+    Server-side callbacks declared in the same batch, registered as a single Dash callback. Its inputs are
+    the inputs of all the members (triggers become regular inputs, whose values are not passed to the
+    members declaring them as triggers), so a user action changing several of them results in one request.
+    Only the members whose inputs changed are run; the outputs of the others are left unchanged.
+    Members must not write the same outputs nor read the outputs of each other, and must agree on the other
+    keyword arguments.
+    '''
+
+    def __init__(self, batch, members):
+        outputs, inputs, states = OrderedDict(), OrderedDict(), OrderedDict()
+        for member in members:
+            for output in member.outputs:
+                key = _dependency_key(output)
+                if key in outputs:
+                    raise WeaverletException(
+                        f'Callbacks {outputs[key][1]} and {member} of batch {batch} write the same output {_get_prop_id(output)}.')
+                outputs[key] = (output, member)
+            for input in member.inputs:
+                inputs.setdefault(_dependency_key(input), Input(input.component_id, input.component_property))
+            for state in member.states:
+                states.setdefault(_dependency_key(state), state)
+        # a member reading the output of another one must run after it, in a request of its own
+        for member in members:
+            for input in member.inputs:
+                writer = outputs.get(_dependency_key(input), (None, member))[1]
+                if writer is not member:
+                    raise WeaverletException(
+                        f'Callback {member} of batch {batch} reads the output {_get_prop_id(input)} of callback {writer} of the same batch.')
+        # a state that is also an input of the batch is read from the input
+        for key in inputs:
+            states.pop(key, None)
+
+        kwargs = {}
+        for member in members:
+            for key, value in member.kwargs.items():
+                if key in ('output', 'inputs', 'state', BATCH_KWARG):
+                    continue
+                if key in kwargs and kwargs[key] != value:
+                    raise WeaverletException(
+                        f'Callbacks of batch {batch} have different values for {key}.')
+                kwargs[key] = value
+
+        output_dependencies = [output for output, _ in outputs.values()]
+        super().__init__(members[0].component, [*output_dependencies, *inputs.values(), *states.values()], kwargs)
+        self.batch = batch
+        self.members = members
+        self._input_keys = list(inputs)
+        self._state_keys = list(states)
+        self._output_keys = list(outputs)
+
+    @property
+    def name(self):
+        return 'batch(' + ', '.join(member.name for member in self.members) + ')'
+
+    def make_function(self, functions):
+        members = self.members
+        input_keys, state_keys, output_keys = self._input_keys, self._state_keys, self._output_keys
+        prop_ids = {_get_prop_id(input): key for key, input in zip(input_keys, self.inputs)}
+
+        def batched_callback(*args):
+            values = dict(zip(input_keys, args[:len(input_keys)]))
+            values.update(zip(state_keys, args[len(input_keys):]))
+            triggered = {prop_ids.get(item['prop_id']) for item in callback_context.triggered}
+            # on the initial call, or when a wildcard input changed, the changed members are not known
+            run_all = None in triggered
+
+            results = {}
+            for member, function in zip(members, functions):
+                if not run_all and not any(_dependency_key(input) in triggered for input in member.inputs):
+                    continue
+                call_args = [values[_dependency_key(input)] for input in member.inputs if not isinstance(input, Trigger)]
+                call_args += [values[_dependency_key(state)] for state in member.states]
+                try:
+                    result = function(*call_args)
+                except PreventUpdate:
+                    continue
+                if _is_no_update(result):
+                    continue
+                member_results = list(result) if member.multi_output else [result]
+                results.update(zip((_dependency_key(output) for output in member.outputs), member_results))
+
+            output_values = [results.get(key, no_update) for key in output_keys]
+            if all(_is_no_update(value) for value in output_values):
+                raise PreventUpdate
+            return output_values if self.multi_output else output_values[0]
+
+        batched_callback.__name__ = f'batch_{members[0].name}'
+        return batched_callback
+
+
+def batch_callbacks(specs):
+    '''
+    Replaces the server-side callbacks declared with the same batch= keyword argument by a single
+    BatchedCallbackSpec, placed where the first of them was. The batch keyword is removed from the others.
+    '''
+    batches = OrderedDict()
+    for spec in specs:
+        batch = spec.kwargs.get(BATCH_KWARG)
+        if batch is not None and not spec.clientside and spec.members is None:
+            batches.setdefault(batch, []).append(spec)
+
+    replacements = {}
+    for batch, members in batches.items():
+        if len(members) < 2:
+            continue
+        batched_spec = BatchedCallbackSpec(batch, members)
+        logger.info(
+            f'[batch_callbacks] batching {len(members)} callbacks into {batched_spec}')
+        replacements[id(members[0])] = batched_spec
+        for member in members[1:]:
+            replacements[id(member)] = None
+
+    batched_specs = []
+    for spec in specs:
+        replacement = replacements.get(id(spec), spec)
+        if replacement is None:
+            continue
+        if BATCH_KWARG in replacement.kwargs:
+            replacement.kwargs = {key: value for key, value in replacement.kwargs.items() if key != BATCH_KWARG}
+        batched_specs.append(replacement)
+    return batched_specs
@@ -0,0 +1,81 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from plotly.utils import PlotlyJSONEncoder
+
+CACHE_MISS = object()
+
+
+class LayoutCache():
+    '''
+    Thread-safe LRU cache with an optional time-to-live, used by the routers to keep rendered page layouts.
+    Keys are tuples whose first element is the route, so all the entries of a route can be invalidated at once.
+    '''
+
+    def __init__(self, max_size=128, ttl=None, timer=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key, CACHE_MISS)
+            if entry is CACHE_MISS:
+                return CACHE_MISS
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._timer():
+                del self._entries[key]
+                return CACHE_MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = self._timer() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, route=None):
+        with self._lock:
+            if route is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == route]:
+                    del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def make_layout_cache_key(route, component, layout_args, identity=(), params=None):
+    '''
+    Returns the cache key of a page layout, or None if the page component does not declare layout_cache_args.
+    identity (e.g. the user and the browser session) is part of the key, so that layouts are not shared
+    among the users. So are the params matched in the route (e.g. /item/<item_id>), which the page
+    layout always depends on.
+    '''
+    if component.layout_cache_args is None:
+        return None
+    values = [layout_args.get(arg_name) for arg_name in component.layout_cache_args]
+    params = sorted(params.items()) if params else ()
+    return (route, _make_hashable(identity), _make_hashable(params), _make_hashable(values))
+
+
+def _make_hashable(values):
+    result = []
+    for value in values:
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        result.append(value)
+    return tuple(result)
+
+
+def layout_to_json(layout):
+    return json.loads(json.dumps(layout, cls=PlotlyJSONEncoder))
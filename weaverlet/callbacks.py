@@ -0,0 +1,123 @@
+from dash.dependencies import Input, Output, State, ALL, ALLSMALLER
+from .logger import logger
+
+
+def _flatten_dependencies(items):
+    flat = []
+    stack = [items]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+        elif item is not None:
+            flat.append(item)
+    return flat
+
+
+class CallbackSpec():
+    '''
+    A callback registered by a component, with its dependencies split into outputs, inputs (including triggers)
+    and states, in declaration order.
+    '''
+
+    # callbacks made of several registered callbacks (e.g. fused signal chains) list them here
+    members = None
+
+    def __init__(self, component, args, kwargs, function=None, clientside=False):
+        self.component = component
+        self.args = args
+        self.kwargs = kwargs
+        self.function = function
+        self.clientside = clientside
+
+        dependencies = _flatten_dependencies(
+            list(args) + [kwargs.get(key) for key in ('output', 'inputs', 'state')])
+        self.outputs = [dependency for dependency in dependencies if isinstance(dependency, Output)]
+        self.inputs = [dependency for dependency in dependencies if isinstance(dependency, Input)]
+        self.states = [dependency for dependency in dependencies if isinstance(dependency, State)]
+        # Dash passes all the input values first, then all the state values
+        self.arguments = self.inputs + self.states
+
+    @property
+    def name(self):
+        if self.clientside:
+            return 'clientside_callback'
+        return getattr(self.function, '__name__', 'callback')
+
+    @property
+    def multi_output(self):
+        # same rule as dash_extensions.enrich: several outputs or a wildcard output
+        if len(self.outputs) > 1:
+            return True
+        return any(
+            isinstance(output.component_id, dict) and any(value in (ALL, ALLSMALLER) for value in output.component_id.values())
+            for output in self.outputs)
+
+    def __str__(self):
+        return f'<{self.name} of {self.component}>'
+
+
+class ComponentApp():
+    '''
+    Proxy of the Dash app passed to the register_callbacks() method of a component. Callbacks are recorded in the
+    callback registry of the WeaverletApp instead of being registered right away; everything else is forwarded
+    to the Dash app.
+    '''
+
+    def __init__(self, app, component, registry):
+        self.app = app
+        self.component = component
+        self.registry = registry
+
+    def callback(self, *args, **kwargs):
+        def wrapper(function):
+            self.registry.add(CallbackSpec(self.component, args, kwargs, function=function))
+            return function
+        return wrapper
+
+    def clientside_callback(self, clientside_function, *args, **kwargs):
+        self.registry.add(
+            CallbackSpec(self.component, args, kwargs, function=clientside_function, clientside=True))
+
+    def __getattr__(self, attr):
+        return getattr(self.app, attr)
+
+
+class CallbackRegistry():
+    '''
+    Collects the callbacks of all the components of a WeaverletApp and registers them in the Dash app.
+    Wrappers (functions taking a CallbackSpec and a callback function and returning a new function)
+    are applied to every server-side callback at registration time, the first added being the innermost.
+    '''
+
+    def __init__(self):
+        self.specs = []
+        self.wrappers = []
+
+    def add(self, spec):
+        self.specs.append(spec)
+
+    def add_wrapper(self, wrapper):
+        self.wrappers.append(wrapper)
+
+    def get_component_app(self, app, component):
+        return ComponentApp(app, component, self)
+
+    def wrap(self, spec):
+        function = spec.function
+        for wrapper in self.wrappers:
+            function = wrapper(spec, function)
+        return function
+
+    def register(self, app):
+        for spec in self.specs:
+            logger.debug(
+                f'[CallbackRegistry.register] registering {spec}')
+            if spec.clientside:
+                app.clientside_callback(spec.function, *spec.args, **dict(spec.kwargs))
+            elif spec.members is not None:
+                # composite callbacks wrap each of their members instead of the composite function
+                function = spec.make_function([self.wrap(member) for member in spec.members])
+                app.callback(*spec.args, **dict(spec.kwargs))(function)
+            else:
+                app.callback(*spec.args, **dict(spec.kwargs))(self.wrap(spec))
@@ -4,4 +4,5 @@ from .signal import SignalComponent
 from .div_signal import DivSignalComponent
 from .simple_router import SimpleRouterComponent
 from .empty_layout import EmptyLayoutComponent
-from .store import StoreComponent, StoreComponentOp
\ No newline at end of file
+from .store import StoreComponent, StoreComponentOp
+from .background_signal import BackgroundSignalComponent
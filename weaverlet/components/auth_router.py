@@ -1,11 +1,12 @@
 # pyright: reportMissingImports=false, reportMissingModuleSource=false
 
-from flask import session
 import dash_html_components as html
 import dash_core_components as dcc
 from dash_extensions.enrich import Input, Output, State
 from ..base import RouterComponent, ComponentsDict, Identifier, ComponentsDict, WeaverletException, DEFAULT_COMPONENT_NAME
 from ..logger import logger
+from ..routing import RouteTable
+from ..session import UserSession
 
 
 class AuthRoutes(ComponentsDict):
@@ -18,12 +19,17 @@ class AuthRouterComponent(RouterComponent):
     content_id = Identifier()
     url_id = Identifier()
 
-    def __init__(self, routes, not_found_page_component, user_session_key='user', login_route='/login', use_prefix=False, name=DEFAULT_COMPONENT_NAME):
-        super().__init__()
+    layout_arg_names = ('pathname', 'hash', 'href', 'search', 'user')
+    layout_identity_arg_names = ('user',)
+
+    def __init__(self, routes, not_found_page_component, user_session_key='user', login_route='/login', use_prefix=False, layout_cache_size=None, layout_cache_ttl=None, user_session=None, name=DEFAULT_COMPONENT_NAME):
+        super().__init__(layout_cache_size=layout_cache_size, layout_cache_ttl=layout_cache_ttl)
         self.use_prefix = use_prefix
         self.routes = AuthRoutes(routes)
         self.not_found_page_component = not_found_page_component
         self.user_session_key = user_session_key
+        # resolves the logged user; pass a UserSession with a backend to keep users on the server
+        self.user_session = user_session if user_session is not None else UserSession(user_session_key=user_session_key)
         self.login_route = login_route
         self.set_name(name)
 
@@ -37,6 +43,20 @@ class AuthRouterComponent(RouterComponent):
 
     def register_callbacks(self, app):
 
+        if self.use_prefix:
+            if 'prefix' in self.get_context():
+                prefix = self.get_context()['prefix']
+            else:
+                raise WeaverletException(
+                    'use_prefix = True but the "prefix" key was not found in the context.')
+        else:
+            prefix = ''
+
+        # compile the routes once into a prefix-resolved lookup table
+        self._route_table = RouteTable(self.routes.keys(), prefix=prefix)
+        self._set_layout_cache_invalidators(
+            {route: value['component'] for route, value in self.routes.items()})
+
         @app.callback(
             Output(self.content_id, 'children'),
             Input(self.url_id, 'pathname'),
@@ -46,33 +66,24 @@ class AuthRouterComponent(RouterComponent):
         )
         def route_callback(pathname, hash, href, search):
 
-            if self.use_prefix:
-                if 'prefix' in self.get_context():
-                    prefix = self.get_context()['prefix']
-                else:
-                    raise WeaverletException(
-                        'use_prefix = True but the "prefix" key was not found in the context.')
-            else:
-                prefix = ''
-
-            for route in self.routes.keys():
-                if pathname == f'{prefix}{route}':
+            route, params = self._route_table.match(pathname)
+            if route is not None:
+                logger.info(
+                    f'[AuthRouterComponent.register_callbacks.route] route {route} matched')
+                if(self.routes[route]['login_required']):
                     logger.info(
-                        f'[AuthRouterComponent.register_callbacks.route] route {route} matched')
-                    if(self.routes[route]['login_required']):
+                        f'[AuthRouterComponent.register_callbacks.route] route {route} requires login')
+                    if self.user_session.is_logged_in():
                         logger.info(
-                            f'[AuthRouterComponent.register_callbacks.route] route {route} requires login')
-                        if self.user_session_key in session:
-                            logger.info(
-                                f'[AuthRouterComponent.register_callbacks.route] user key found in session, rendering layout of {self.routes[route]["component"]}')
-                            user = session[self.user_session_key]
-                            return self.routes[route]['component'](pathname, hash, href, search, user)
-                        else:
-                            logger.info(
-                                f'[AuthRouterComponent.register_callbacks.route] user key not found in session, rendering layout of {self.routes[self.login_route]["component"]}')
-                            return self.routes[self.login_route]['component'](pathname, hash, href, search, f'{prefix}{route}')
+                            f'[AuthRouterComponent.register_callbacks.route] user key found in session, rendering layout of {self.routes[route]["component"]}')
+                        user = self.user_session.get_user()
+                        return self._render_page(route, self.routes[route]['component'], pathname, hash, href, search, user, **params)
                     else:
-                        return self.routes[route]['component'](pathname, hash, href, search)
+                        logger.info(
+                            f'[AuthRouterComponent.register_callbacks.route] user key not found in session, rendering layout of {self.routes[self.login_route]["component"]}')
+                        return self.routes[self.login_route]['component'](pathname, hash, href, search, pathname)
+                else:
+                    return self._render_page(route, self.routes[route]['component'], pathname, hash, href, search, **params)
 
             # user tried to reach a different page
             logger.info(
@@ -0,0 +1,112 @@
+# pyright: reportMissingImports=false
+
+import dash
+from dash.exceptions import PreventUpdate
+import dash_core_components as dcc
+import dash_html_components as html
+from dash_extensions.enrich import Input, Output, State, Trigger
+from .signal import SignalComponent
+from ..base import WeaverletComponent, Identifier, DEFAULT_COMPONENT_NAME
+from ..jobs import JobQueue, JobStatus
+from ..logger import logger
+
+
+class BackgroundSignalComponent(WeaverletComponent):
+    '''
+    A signal whose value is computed by a background job. Writing {'args': [...], 'kwargs': {...}} (both
+    optional) to input_signal queues job_function(job, *args, **kwargs) on the job queue and returns at once;
+    writing anything to cancel_signal cancels the current job. The signal then carries the state of the job,
+    {'job_id', 'status', 'progress'}, polled every poll_interval milliseconds, with 'result' (or 'error') once
+    the job is finished. See weaverlet.jobs for the job function protocol.
+    '''
+
+    signal_id = Identifier()
+    signal_group_id = Identifier()
+    signal_attr = 'data'
+    signal_default_retval = {}
+
+    # internal ids
+    _job_store_id = Identifier()
+    _interval_id = Identifier()
+
+    def __init__(self, job_function, job_queue=None, poll_interval=1000, name=DEFAULT_COMPONENT_NAME):
+        super().__init__()
+        self.set_name(name)
+        self.job_function = job_function
+        self.job_queue = job_queue if job_queue is not None else JobQueue()
+        self.poll_interval = poll_interval
+
+        # input signals
+        self.input_signal = SignalComponent(name='input_signal')
+        self.cancel_signal = SignalComponent(name='cancel_signal')
+
+    def get_layout(self):
+        layout = \
+            html.Div(
+                [
+                    self.input_signal(),
+                    self.cancel_signal(),
+                    dcc.Store(id=self.signal_id, data={}),
+                    dcc.Store(id=self._job_store_id, data=None),
+                    dcc.Interval(id=self._interval_id, interval=self.poll_interval, disabled=True)
+                ]
+            )
+        return layout
+
+    def register_callbacks(self, app):
+
+        @app.callback(
+            Output(self.signal_id, self.signal_attr),
+            Output(self._job_store_id, 'data'),
+            Output(self._interval_id, 'disabled'),
+            Input(self.input_signal.signal_id, self.input_signal.signal_attr),
+            State(self._job_store_id, 'data'),
+            group=self.signal_group_id
+        )
+        def start_job(input_signal_data, current_job_id):
+            if input_signal_data is None:
+                raise PreventUpdate
+            if current_job_id is not None:
+                # a new job replaces the current one
+                self.job_queue.cancel(current_job_id)
+            job_id = self.job_queue.submit(
+                self.job_function, *input_signal_data.get('args', []), **input_signal_data.get('kwargs', {}))
+            logger.debug(
+                f'[BackgroundSignalComponent.register_callbacks.start_job] job {job_id} queued')
+            return {'job_id': job_id, 'status': JobStatus.QUEUED, 'progress': None}, job_id, False
+
+        @app.callback(
+            Output(self.signal_id, self.signal_attr),
+            Output(self._job_store_id, 'data'),
+            Output(self._interval_id, 'disabled'),
+            Trigger(self._interval_id, 'n_intervals'),
+            State(self._job_store_id, 'data'),
+            State(self.signal_id, self.signal_attr),
+            group=self.signal_group_id
+        )
+        def poll_job(job_id, current_signal_data):
+            if job_id is None:
+                return dash.no_update, dash.no_update, True
+            state = self.job_queue.get_state(job_id)
+            if state is None:
+                logger.warning(
+                    f'[BackgroundSignalComponent.register_callbacks.poll_job] unknown job {job_id}')
+                return {'job_id': job_id, 'status': JobStatus.FAILED, 'error': 'Unknown job.'}, None, True
+
+            signal_data = {'job_id': job_id, **state}
+            if state['status'] in JobStatus.FINISHED:
+                self.job_queue.delete(job_id)
+                return signal_data, None, True
+            if signal_data == current_signal_data:
+                raise PreventUpdate
+            return signal_data, dash.no_update, dash.no_update
+
+        @app.callback(
+            Input(self.cancel_signal.signal_id, self.cancel_signal.signal_attr),
+            State(self._job_store_id, 'data')
+        )
+        def cancel_job(cancel_signal_data, job_id):
+            if job_id is not None:
+                logger.debug(
+                    f'[BackgroundSignalComponent.register_callbacks.cancel_job] cancelling job {job_id}')
+                self.job_queue.cancel(job_id)
@@ -5,6 +5,7 @@ import dash_core_components as dcc
 from dash_extensions.enrich import Input, Output, State
 from ..base import RouterComponent, ComponentsDict, Identifier, ComponentsDict, WeaverletException, DEFAULT_COMPONENT_NAME
 from ..logger import logger
+from ..routing import RouteTable
 
 
 class SimpleRoutes(ComponentsDict):
@@ -17,8 +18,8 @@ class SimpleRouterComponent(RouterComponent):
     content_id = Identifier()
     url_id = Identifier()
 
-    def __init__(self, routes, not_found_page_component, use_prefix=False, name=DEFAULT_COMPONENT_NAME):
-        super().__init__()
+    def __init__(self, routes, not_found_page_component, use_prefix=False, layout_cache_size=None, layout_cache_ttl=None, name=DEFAULT_COMPONENT_NAME):
+        super().__init__(layout_cache_size=layout_cache_size, layout_cache_ttl=layout_cache_ttl)
         self.use_prefix = use_prefix
         self.routes = SimpleRoutes(routes)
         self.not_found_page_component = not_found_page_component
@@ -34,6 +35,19 @@ class SimpleRouterComponent(RouterComponent):
 
     def register_callbacks(self, app):
 
+        if self.use_prefix:
+            if 'prefix' in self.get_context():
+                prefix = self.get_context()['prefix']
+            else:
+                raise WeaverletException(
+                    'use_prefix = True but the "prefix" key was not found in the context.')
+        else:
+            prefix = ''
+
+        # compile the routes once into a prefix-resolved lookup table
+        self._route_table = RouteTable(self.routes.keys(), prefix=prefix)
+        self._set_layout_cache_invalidators(self.routes)
+
         @app.callback(
             Output(self.content_id, 'children'),
             Input(self.url_id, 'pathname'),
@@ -43,20 +57,11 @@ class SimpleRouterComponent(RouterComponent):
         )
         def route_callback(pathname, hash, href, search):
 
-            if self.use_prefix:
-                if 'prefix' in self.get_context():
-                    prefix = self.get_context()['prefix']
-                else:
-                    raise WeaverletException(
-                        'use_prefix = True but the "prefix" key was not found in the context.')
-            else:
-                prefix = ''
-
-            for route in self.routes.keys():
-                if pathname == f'{prefix}{route}':
-                    logger.info(
-                        f'[SimpleRouterComponent.register_callbacks.route] route {route} matched')
-                    return self.routes[route](pathname, hash, href, search)
+            route, params = self._route_table.match(pathname)
+            if route is not None:
+                logger.info(
+                    f'[SimpleRouterComponent.register_callbacks.route] route {route} matched')
+                return self._render_page(route, self.routes[route], pathname, hash, href, search, **params)
 
             # user tried to reach a different page
             logger.info(
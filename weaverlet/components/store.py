@@ -5,16 +5,55 @@ from weaverlet.components.signal import SignalComponent
 import dash_core_components as dcc
 import dash_html_components as html
 from ..base import WeaverletComponent, Identifier, DEFAULT_COMPONENT_NAME, WeaverletException
-from dash_extensions.enrich import Input, Output, State, Trigger
+from dash_extensions.enrich import Input, Output, State, Trigger, ServersideOutput
 from ..logger import logger
+from ..delta import apply_delta, APPLY_DELTA_JS
 
 class StoreComponentOp():
     STORE = 'store'
     MERGE = 'merge'
     CLEAN = 'clean'
+    # data is a list of changes built with weaverlet.delta (delta_set, delta_delete, delta_merge)
+    PATCH = 'patch'
 
 class StoreComponent(WeaverletComponent):
 
+    # clientside version of the input_signal, store_signal, merge_signal and clean_signal callbacks,
+    # speaking the same StoreComponentOp protocol
+    store_clientside_callback = \
+        """
+        function(input_signal_data, current_data) {
+            const applyDelta = %s;
+            if (!input_signal_data) {
+                return window.dash_clientside.no_update;
+            }
+            switch (input_signal_data.op) {
+                case 'store':
+                    return input_signal_data.data;
+                case 'merge':
+                    return Object.assign({}, current_data, input_signal_data.data);
+                case 'clean':
+                    return {};
+                case 'patch':
+                    return applyDelta(current_data, input_signal_data.data);
+                default:
+                    throw new Error('Unkown store operation: ' + input_signal_data.op);
+            }
+        }
+        """ % APPLY_DELTA_JS
+
+    # applies PATCH deltas in the browser, so that only the delta crosses the wire
+    patch_clientside_callback = \
+        """
+        function(delta, current_data) {
+            const applyDelta = %s;
+            if (!delta) {
+                return window.dash_clientside.no_update;
+            }
+            return applyDelta(current_data, delta);
+        }
+        """ % APPLY_DELTA_JS
+
     store_attr = 'data'
 
     # external ids
@@ -23,14 +62,21 @@ class StoreComponent(WeaverletComponent):
     # internal ids
     _store_group_id = Identifier()
     
-    def __init__(self, name=DEFAULT_COMPONENT_NAME):
+    def __init__(self, name=DEFAULT_COMPONENT_NAME, clientside=False, serverside_backend=None):
         super().__init__()
         self.set_name(name)
+        if clientside and serverside_backend is not None:
+            raise WeaverletException('A StoreComponent cannot be both clientside and serverside.')
+        self.clientside = clientside
+        # storage backend (e.g. weaverlet.storage.MemoryBackend) keeping the data on the server;
+        # the browser then only holds a key
+        self.serverside_backend = serverside_backend
 
         # internal signals
         self._clean_signal = SignalComponent(name='clean_signal')
         self._store_signal = SignalComponent(name='store_signal')
         self._merge_signal = SignalComponent(name='merge_signal')
+        self._patch_signal = SignalComponent(name='patch_signal')
 
         # input signals
         self.input_signal  = SignalComponent(name='input_signal')
@@ -42,29 +88,75 @@ class StoreComponent(WeaverletComponent):
                     self._clean_signal(),
                     self._store_signal(),
                     self._merge_signal(),
+                    self._patch_signal(),
                     self.input_signal(),                    
-                    dcc.Store(id=self.store_id, data={})
+                    dcc.Store(id=self.store_id, data=None if self.serverside_backend is not None else {})
                 ]
             )
             
         return layout
 
     def register_callbacks(self, app):
+
+        if self.clientside:
+            # all the operations run in the browser, without any server request
+            app.clientside_callback(
+                self.store_clientside_callback,
+                Output(self.store_id, self.store_attr),
+                Input(self.input_signal.signal_id, self.input_signal.signal_attr),
+                State(self.store_id, self.store_attr)
+            )
+            return
+
+        if self.serverside_backend is not None:
+            # a single callback reading and writing the server-side data: only keys cross the wire
+            @app.callback(
+                ServersideOutput(self.store_id, self.store_attr, backend=self.serverside_backend),
+                Input(self.input_signal.signal_id, self.input_signal.signal_attr),
+                State(self.store_id, self.store_attr)
+            )
+            def serverside_input_signal(input_signal_data, current_data):
+                logger.debug(f'[StoreComponent.register_callbacks.serverside_input_signal] ! input_signal_data = {input_signal_data}')
+                if current_data is None:
+                    # the browser holds a key, but its entry expired or was evicted from the backend
+                    if isinstance(dash.callback_context.states_list[0].get('value'), str) and \
+                            input_signal_data['op'] in (StoreComponentOp.MERGE, StoreComponentOp.PATCH):
+                        logger.error(
+                            f'[StoreComponent.register_callbacks.serverside_input_signal] data of {self.store_id} missing from the backend, '
+                            f'cannot apply {input_signal_data["op"]}')
+                        raise WeaverletException(
+                            f'The data of {self.store_id} expired or was evicted from the serverside backend, '
+                            f'{input_signal_data["op"]} cannot be applied. Send a {StoreComponentOp.STORE} first.')
+                    current_data = {}
+                if input_signal_data['op'] == StoreComponentOp.STORE:
+                    return input_signal_data['data']
+                elif input_signal_data['op'] == StoreComponentOp.MERGE:
+                    return {**current_data, **input_signal_data['data']}
+                elif input_signal_data['op'] == StoreComponentOp.CLEAN:
+                    return {}
+                elif input_signal_data['op'] == StoreComponentOp.PATCH:
+                    return apply_delta(current_data, input_signal_data['data'])
+                else:
+                    raise WeaverletException(f'Unkown store operation: {input_signal_data["op"]}')
+            return
         
         @app.callback(
             Output(self._store_signal.signal_id, self._store_signal.signal_attr),
             Output(self._merge_signal.signal_id, self._merge_signal.signal_attr),
             Output(self._clean_signal.signal_id, self._clean_signal.signal_attr),
+            Output(self._patch_signal.signal_id, self._patch_signal.signal_attr),
             Input(self.input_signal.signal_id, self.input_signal.signal_attr),            
         )
         def input_signal(input_signal_data):
             logger.debug(f'[StoreComponent.register_callbacks.input_signal] ! input_signal_data = {input_signal_data}') 
             if input_signal_data['op'] == StoreComponentOp.STORE:
-                return input_signal_data['data'], dash.no_update, dash.no_update
+                return input_signal_data['data'], dash.no_update, dash.no_update, dash.no_update
             elif input_signal_data['op'] == StoreComponentOp.MERGE:
-                return dash.no_update, input_signal_data['data'], dash.no_update
+                return dash.no_update, input_signal_data['data'], dash.no_update, dash.no_update
             elif input_signal_data['op'] == StoreComponentOp.CLEAN:
-                return dash.no_update, dash.no_update, self._clean_signal.signal_default_retval
+                return dash.no_update, dash.no_update, self._clean_signal.signal_default_retval, dash.no_update
+            elif input_signal_data['op'] == StoreComponentOp.PATCH:
+                return dash.no_update, dash.no_update, dash.no_update, input_signal_data['data']
             else:
                 raise WeaverletException(f'Unkown store operation: {input_signal_data["op"]}')
 
@@ -96,4 +188,11 @@ class StoreComponent(WeaverletComponent):
         )
         def clean_signal():        
             logger.debug(f'[StoreComponent.register_callbacks.clean_signal] !')    
-            return {}
\ No newline at end of file
+            return {}
+
+        app.clientside_callback(
+            self.patch_clientside_callback,
+            Output(self.store_id, self.store_attr),
+            Input(self._patch_signal.signal_id, self._patch_signal.signal_attr),
+            State(self.store_id, self.store_attr)
+        )
@@ -0,0 +1,105 @@
+from .base import WeaverletException
+
+DELTA_SET = 'set'
+DELTA_DELETE = 'delete'
+DELTA_MERGE = 'merge'
+
+# JavaScript version of apply_delta, for clientside callbacks
+APPLY_DELTA_JS = \
+    """
+    function(data, delta) {
+        const result = Object.assign({}, data);
+        delta.forEach(function(change) {
+            const path = change.path;
+            if (!path || path.length === 0) {
+                throw new Error('Delta paths must not be empty.');
+            }
+            let node = result;
+            for (let i = 0; i < path.length - 1; i++) {
+                const child = node[path[i]];
+                if (child === null || typeof child !== 'object' || Array.isArray(child)) {
+                    if (change.op === 'delete') {
+                        return;
+                    }
+                    node[path[i]] = {};
+                } else {
+                    node[path[i]] = Object.assign({}, child);
+                }
+                node = node[path[i]];
+            }
+            const key = path[path.length - 1];
+            switch (change.op) {
+                case 'set':
+                    node[key] = change.value;
+                    break;
+                case 'delete':
+                    delete node[key];
+                    break;
+                case 'merge': {
+                    // a value that is not an object is replaced
+                    const current = node[key];
+                    const base = (current === null || typeof current !== 'object' || Array.isArray(current)) ? {} : current;
+                    node[key] = Object.assign({}, base, change.value);
+                    break;
+                }
+                default:
+                    throw new Error('Unknown delta operation: ' + change.op);
+            }
+        });
+        return result;
+    }
+    """
+
+
+def delta_set(path, value):
+    return {'op': DELTA_SET, 'path': list(path), 'value': value}
+
+
+def delta_delete(path):
+    return {'op': DELTA_DELETE, 'path': list(path)}
+
+
+def delta_merge(path, value):
+    return {'op': DELTA_MERGE, 'path': list(path), 'value': value}
+
+
+def apply_delta(data, delta):
+    '''
+    Applies a list of changes (built with delta_set, delta_delete and delta_merge) to a dict of nested dicts.
+    Returns a new dict; only the dicts along the changed paths are copied, data itself is not modified.
+    Values that are not dicts (e.g. lists) along a path, or merged into, are replaced by dicts.
+    '''
+    result = dict(data or {})
+    for change in delta:
+        path = change['path']
+        if not path:
+            raise WeaverletException('Delta paths must not be empty.')
+
+        node = result
+        missing = False
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                if change['op'] == DELTA_DELETE:
+                    missing = True
+                    break
+                child = {}
+            else:
+                child = dict(child)
+            node[key] = child
+            node = child
+        if missing:
+            continue
+
+        key = path[-1]
+        if change['op'] == DELTA_SET:
+            node[key] = change['value']
+        elif change['op'] == DELTA_DELETE:
+            node.pop(key, None)
+        elif change['op'] == DELTA_MERGE:
+            # a value that is not a dict is replaced, as in APPLY_DELTA_JS
+            current = node.get(key)
+            node[key] = {**(current if isinstance(current, dict) else {}), **change['value']}
+        else:
+            raise WeaverletException(f'Unknown delta operation: {change["op"]}')
+    return result
@@ -0,0 +1,183 @@
+from collections import defaultdict
+from dash import no_update
+from dash.exceptions import PreventUpdate
+from dash_extensions.enrich import Trigger
+from .callbacks import CallbackSpec
+from .logger import logger
+
+# keyword arguments of a callback that do not prevent it from being fused
+FUSABLE_KWARGS = ('group', 'prevent_initial_call')
+
+
+def get_dependency_key(dependency):
+    if isinstance(dependency.component_id, dict):
+        return None
+    return (dependency.component_id, dependency.component_property)
+
+
+def get_signal_keys(components):
+    '''
+    Dependency keys of the signals (components exposing signal_id and signal_attr) in the component tree.
+    '''
+    # signals in a ComponentArray have dict ids, and are not fused
+    return {(component.signal_id, component.signal_attr) for component in components
+            if hasattr(type(component), 'signal_id') and hasattr(type(component), 'signal_attr')
+            and isinstance(component.signal_id, str)}
+
+
+def _is_no_update(value):
+    return isinstance(value, type(no_update))
+
+
+class FusedCallbackSpec(CallbackSpec):
+    '''
+    A linear chain of server-side callbacks connected through signals, executed in-process as a single callback.
+    The chain is triggered by the inputs of its first member; the states of all members are sent along with
+    the request. Signals linking two members are only returned to the browser if other callbacks read them.
+    '''
+
+    def __init__(self, chain, links, kept_outputs):
+        head = chain[0]
+        outputs = [output for member, kept in zip(chain, kept_outputs)
+                   for output, keep in zip(member.outputs, kept) if keep]
+        extra_states = [state for member in chain[1:] for state in member.states]
+        kwargs = {key: value for key, value in head.kwargs.items() if key not in ('output', 'inputs', 'state')}
+        super().__init__(head.component, [*outputs, *head.inputs, *head.states, *extra_states], kwargs)
+        self.members = chain
+        # index, in the outputs of each member, of the signal feeding the next member
+        self.links = links
+        self.kept_outputs = kept_outputs
+
+    @property
+    def name(self):
+        return 'fused(' + ', '.join(member.name for member in self.members) + ')'
+
+    def make_function(self, functions):
+        members = self.members
+        head_arg_count = len([dependency for dependency in members[0].arguments if not isinstance(dependency, Trigger)])
+
+        def fused_callback(*args):
+            args = list(args)
+            offset = head_arg_count
+            member_outputs = []
+            skipped = False
+            for index, (member, function) in enumerate(zip(members, functions)):
+                if index == 0:
+                    call_args = args[:head_arg_count]
+                else:
+                    state_values = args[offset:offset + len(member.states)]
+                    offset += len(member.states)
+                    link_value = member_outputs[-1][self.links[index - 1]]
+                    skipped = skipped or _is_no_update(link_value)
+                    call_args = ([] if isinstance(member.inputs[0], Trigger) else [link_value]) + state_values
+
+                if skipped:
+                    member_outputs.append([no_update] * len(member.outputs))
+                    continue
+
+                try:
+                    result = function(*call_args)
+                except PreventUpdate:
+                    if index == 0:
+                        raise
+                    skipped = True
+                    member_outputs.append([no_update] * len(member.outputs))
+                    continue
+
+                if _is_no_update(result):
+                    member_outputs.append([no_update] * len(member.outputs))
+                elif member.multi_output:
+                    member_outputs.append(list(result))
+                else:
+                    member_outputs.append([result])
+
+            values = [value for outputs, kept in zip(member_outputs, self.kept_outputs)
+                      for value, keep in zip(outputs, kept) if keep]
+            if all(_is_no_update(value) for value in values):
+                raise PreventUpdate
+            return values if self.multi_output else values[0]
+
+        fused_callback.__name__ = f'fused_{members[0].name}'
+        return fused_callback
+
+
+def _is_fusable(spec):
+    return not spec.clientside and spec.members is None and all(key in FUSABLE_KWARGS for key in spec.kwargs)
+
+
+def fuse_signal_chains(specs, signal_keys):
+    '''
+    Replaces each linear chain of server-side callbacks linked through signals by a single FusedCallbackSpec.
+    A callback A is linked to a callback B through a signal S when A is the only callback writing S,
+    B is the only callback using S as input and S is the only input of B.
+    '''
+    writers = defaultdict(list)
+    input_readers = defaultdict(list)
+    state_readers = defaultdict(list)
+    for spec in specs:
+        for output in spec.outputs:
+            writers[get_dependency_key(output)].append(spec)
+        for input in spec.inputs:
+            input_readers[get_dependency_key(input)].append(spec)
+        for state in spec.states:
+            state_readers[get_dependency_key(state)].append(spec)
+
+    # successor of each callback with exactly one fusable link: id(spec) -> (output index, next spec)
+    successors = {}
+    for spec in specs:
+        if not _is_fusable(spec):
+            continue
+        links = []
+        for index, output in enumerate(spec.outputs):
+            key = get_dependency_key(output)
+            if key not in signal_keys or len(writers[key]) != 1 or len(input_readers[key]) != 1:
+                continue
+            next_spec = input_readers[key][0]
+            if next_spec is spec or not _is_fusable(next_spec) or len(next_spec.inputs) != 1:
+                continue
+            links.append((index, next_spec))
+        if len(links) == 1:
+            successors[id(spec)] = links[0]
+    linked = {id(next_spec) for _, next_spec in successors.values()}
+
+    replacements = {}
+    for spec in specs:
+        if id(spec) in linked or id(spec) not in successors:
+            continue
+        chain, links = [spec], []
+        chain_outputs = {get_dependency_key(output) for output in spec.outputs}
+        while id(chain[-1]) in successors:
+            index, next_spec = successors[id(chain[-1])]
+            # the states of the next member must not be written within the chain, they would be stale
+            if any(next_spec is member for member in chain) or \
+                    any(get_dependency_key(state) in chain_outputs for state in next_spec.states):
+                break
+            links.append(index)
+            chain.append(next_spec)
+            chain_outputs.update(get_dependency_key(output) for output in next_spec.outputs)
+        if len(chain) < 2:
+            continue
+
+        kept_outputs = []
+        for position, member in enumerate(chain):
+            kept = [True] * len(member.outputs)
+            if position < len(links):
+                link_key = get_dependency_key(member.outputs[links[position]])
+                kept[links[position]] = len(state_readers[link_key]) > 0
+            kept_outputs.append(kept)
+        if not any(any(kept) for kept in kept_outputs):
+            continue
+
+        fused_spec = FusedCallbackSpec(chain, links, kept_outputs)
+        logger.info(
+            f'[fuse_signal_chains] fusing {len(chain)} callbacks into {fused_spec}')
+        replacements[id(spec)] = fused_spec
+        for member in chain[1:]:
+            replacements[id(member)] = None
+
+    fused_specs = []
+    for spec in specs:
+        replacement = replacements.get(id(spec), spec)
+        if replacement is not None:
+            fused_specs.append(replacement)
+    return fused_specs
@@ -0,0 +1,139 @@
+import os
+import uuid
+import pickle
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .base import WeaverletException
+from .logger import logger
+
+
+class JobStatus():
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job():
+    '''
+    Handle passed to job functions as their first argument, to report progress and check for cancellation.
+    It only holds the job id and the queue directory, so it can be sent to another process.
+    '''
+
+    def __init__(self, job_id, directory):
+        self.job_id = job_id
+        self.directory = directory
+
+    def set_progress(self, progress):
+        '''
+        Reports progress (any picklable value, e.g. a fraction or a message). Raises JobCancelled if the
+        job was cancelled, so that job functions reporting progress stop without checking is_cancelled().
+        '''
+        if self.is_cancelled():
+            raise JobCancelled()
+        _write_state(self.directory, self.job_id, {'status': JobStatus.RUNNING, 'progress': progress})
+
+    def is_cancelled(self):
+        return os.path.exists(_get_path(self.directory, self.job_id, 'cancel'))
+
+
+def _get_path(directory, job_id, kind):
+    return os.path.join(directory, f'{job_id}.{kind}')
+
+
+def _write_state(directory, job_id, state):
+    path = _get_path(directory, job_id, 'state')
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _run_job(function, job, args, kwargs):
+    if job.is_cancelled():
+        _write_state(job.directory, job.job_id, {'status': JobStatus.CANCELLED})
+        return
+    _write_state(job.directory, job.job_id, {'status': JobStatus.RUNNING, 'progress': None})
+    try:
+        result = function(job, *args, **kwargs)
+    except JobCancelled:
+        _write_state(job.directory, job.job_id, {'status': JobStatus.CANCELLED})
+    except Exception as e:
+        logger.exception(
+            f'[JobQueue._run_job] job {job.job_id} failed')
+        _write_state(job.directory, job.job_id, {'status': JobStatus.FAILED, 'error': f'{type(e).__name__}: {e}'})
+    else:
+        _write_state(job.directory, job.job_id, {'status': JobStatus.DONE, 'result': result})
+
+
+class JobQueue():
+    '''
+    Runs jobs on a local process (or thread) pool. The state of each job (status, progress and result) is kept
+    in a file in directory, so any process sharing the directory (e.g. the workers of a pre-fork server) can
+    poll or cancel a job, whichever process started it. Job functions receive a Job as their first argument,
+    and must be picklable (defined at module level) when using processes.
+    '''
+
+    def __init__(self, executor='process', max_workers=None, directory=None):
+        if executor not in ('process', 'thread'):
+            raise WeaverletException(f'Unknown executor: {executor}, use "process" or "thread".')
+        self.executor = executor
+        self.max_workers = max_workers
+        self.directory = directory if directory is not None else tempfile.mkdtemp(prefix='weaverlet_jobs_')
+        os.makedirs(self.directory, exist_ok=True)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            # pools do not survive a fork, each process starts its own
+            if self._pool is None or self._pid != os.getpid():
+                pool_class = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+                self._pool = pool_class(max_workers=self.max_workers)
+                self._pid = os.getpid()
+            return self._pool
+
+    def submit(self, function, *args, **kwargs):
+        job_id = uuid.uuid4().hex
+        _write_state(self.directory, job_id, {'status': JobStatus.QUEUED})
+        self._get_pool().submit(_run_job, function, Job(job_id, self.directory), args, kwargs)
+        logger.debug(
+            f'[JobQueue.submit] job {job_id} queued')
+        return job_id
+
+    def get_state(self, job_id):
+        '''
+        Returns a dict with the status of the job and, depending on it, its progress, result or error;
+        None for unknown jobs.
+        '''
+        try:
+            with open(_get_path(self.directory, job_id, 'state'), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.PickleError):
+            return None
+
+    def cancel(self, job_id):
+        '''
+        Asks a job to stop. Queued jobs do not start; running jobs stop the next time they report progress
+        (or check Job.is_cancelled()).
+        '''
+        if not os.path.exists(_get_path(self.directory, job_id, 'state')):
+            return
+        with open(_get_path(self.directory, job_id, 'cancel'), 'w'):
+            pass
+
+    def delete(self, job_id):
+        for kind in ('state', 'cancel'):
+            try:
+                os.remove(_get_path(self.directory, job_id, kind))
+            except OSError:
+                pass
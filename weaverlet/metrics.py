@@ -0,0 +1,140 @@
+import json
+import time
+import bisect
+import functools
+import threading
+from collections import OrderedDict
+import plotly
+from dash.exceptions import PreventUpdate
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def get_payload_size(value):
+    '''
+    Size in bytes of the JSON serialization of a callback argument or return value, or None if not serializable.
+    '''
+    try:
+        return len(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8'))
+    except (TypeError, ValueError):
+        return None
+
+
+class Histogram():
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class CallbackStats():
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.input_bytes = Histogram(PAYLOAD_BUCKETS)
+        self.output_bytes = Histogram(PAYLOAD_BUCKETS)
+
+
+class CallbackMetrics():
+    '''
+    Per-callback call counts, error counts, latency and payload size histograms, labelled by component id,
+    component class and callback name. Installed by WeaverletApp(metrics=True) as a callback registry wrapper.
+    '''
+
+    def __init__(self, measure_payloads=True):
+        self.measure_payloads = measure_payloads
+        self.stats = OrderedDict()
+        self._lock = threading.Lock()
+        # extra collectors returning Prometheus text lines, e.g. cache backends
+        self.collectors = []
+
+    def instrument(self, spec, function):
+        labels = (spec.component.get_id(), type(spec.component).__name__, spec.name)
+        with self._lock:
+            stats = self.stats.setdefault(labels, CallbackStats())
+
+        @functools.wraps(function)
+        def instrumented_callback(*args):
+            start = time.perf_counter()
+            error = False
+            output = None
+            try:
+                output = function(*args)
+                return output
+            except PreventUpdate:
+                raise
+            except Exception:
+                error = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                input_size = get_payload_size(list(args)) if self.measure_payloads else None
+                output_size = get_payload_size(output) if self.measure_payloads and not error else None
+                with self._lock:
+                    stats.calls += 1
+                    stats.errors += error
+                    stats.latency.observe(elapsed)
+                    if input_size is not None:
+                        stats.input_bytes.observe(input_size)
+                    if output_size is not None:
+                        stats.output_bytes.observe(output_size)
+
+        return instrumented_callback
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            series = [(self._format_labels(labels), stats) for labels, stats in self.stats.items()]
+
+            self._add_header(lines, 'weaverlet_callback_calls_total', 'counter', 'Number of callback executions.')
+            lines += [f'weaverlet_callback_calls_total{{{labels}}} {stats.calls}' for labels, stats in series]
+
+            self._add_header(lines, 'weaverlet_callback_errors_total', 'counter', 'Number of callback executions that raised an exception.')
+            lines += [f'weaverlet_callback_errors_total{{{labels}}} {stats.errors}' for labels, stats in series]
+
+            for name, attr, description in [
+                ('weaverlet_callback_latency_seconds', 'latency', 'Callback execution time.'),
+                ('weaverlet_callback_input_bytes', 'input_bytes', 'Size of the JSON-serialized callback inputs and states.'),
+                ('weaverlet_callback_output_bytes', 'output_bytes', 'Size of the JSON-serialized callback outputs.')]:
+                self._add_header(lines, name, 'histogram', description)
+                for labels, stats in series:
+                    lines += self._format_histogram(name, labels, getattr(stats, attr))
+
+        for collector in self.collectors:
+            lines += collector()
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _add_header(lines, name, metric_type, description):
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {metric_type}')
+
+    @staticmethod
+    def _format_labels(labels):
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        component_id, component_class, callback_name = labels
+        return f'component_id="{escape(component_id)}",component_class="{escape(component_class)}",callback="{escape(callback_name)}"'
+
+    @staticmethod
+    def _format_histogram(name, labels, histogram):
+        lines = []
+        cumulative = 0
+        for bucket, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bucket}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return lines
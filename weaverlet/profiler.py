@@ -0,0 +1,92 @@
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+COMPONENT_METHODS = ('initialize', 'get_layout', 'register_callbacks')
+
+
+class StartupProfiler():
+    '''
+    Times the phases of WeaverletApp.__init__ and, per component, initialize(), get_layout() and register_callbacks().
+    get_layout() times are reported both inclusive of nested child layouts and exclusive of them (self time).
+    '''
+
+    # profiler collecting get_layout() timings, set only while a WeaverletApp is being built with profile=True
+    active = None
+
+    def __init__(self, timer=time.perf_counter):
+        self._timer = timer
+        self.phases = OrderedDict()
+        self.components = OrderedDict()
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name):
+        start = self._timer()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + self._timer() - start
+
+    @contextmanager
+    def component(self, component, method):
+        # each frame is [start time, time spent in nested profiled calls]
+        frame = [self._timer(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            total = self._timer() - frame[0]
+            if self._stack:
+                self._stack[-1][1] += total
+            stats = self._get_component_stats(component)
+            stats[method] += total
+            stats[f'{method}_self'] += total - frame[1]
+            stats[f'{method}_calls'] += 1
+
+    def _get_component_stats(self, component):
+        key = id(component)
+        if key not in self.components:
+            stats = OrderedDict(id=component.get_id(), cls=type(component).__name__)
+            for method in COMPONENT_METHODS:
+                stats[method] = 0.0
+                stats[f'{method}_self'] = 0.0
+                stats[f'{method}_calls'] = 0
+            self.components[key] = stats
+        return self.components[key]
+
+    def get_component_stats(self):
+        '''
+        Per-component stats sorted by self time (the time not spent in nested child calls), slowest first.
+        '''
+        def self_time(stats):
+            return sum(stats[f'{method}_self'] for method in COMPONENT_METHODS)
+        return sorted(self.components.values(), key=self_time, reverse=True)
+
+    def to_dict(self):
+        return {
+            'phases': dict(self.phases),
+            'components': [dict(stats) for stats in self.get_component_stats()]
+        }
+
+    def to_json(self, path=None):
+        data = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(data)
+        return data
+
+    def report(self, limit=20):
+        lines = ['Startup phases:']
+        for name, elapsed in self.phases.items():
+            lines.append(f'  {name:<24} {elapsed * 1000:>10.2f} ms')
+        lines.append(f'Slowest components (self time, top {limit}):')
+        lines.append(
+            f'  {"component":<48} {"initialize":>12} {"get_layout":>12} {"register_cb":>12}')
+        for stats in self.get_component_stats()[:limit]:
+            label = f'{stats["id"]} ({stats["cls"]})'
+            lines.append(
+                f'  {label:<48} {stats["initialize_self"] * 1000:>9.2f} ms {stats["get_layout_self"] * 1000:>9.2f} ms {stats["register_callbacks_self"] * 1000:>9.2f} ms')
+        return '\n'.join(lines)
@@ -0,0 +1,54 @@
+import gzip
+import hashlib
+import flask
+from dash._utils import to_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# content codings in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class PrecompressedResponse():
+    '''
+    A response body serialized and compressed once (gzip and, when the brotli package is installed, brotli),
+    served with a strong ETag so that clients sending a matching If-None-Match get a 304 without body.
+    '''
+
+    def __init__(self, data, mimetype='application/json'):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(data).hexdigest()
+        self.variants = {None: data, 'gzip': gzip.compress(data, compresslevel=9)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(data)
+
+    def _select_encoding(self, request):
+        accepted = request.accept_encodings
+        for encoding in ENCODINGS:
+            if accepted[encoding] > 0 and len(self.variants[encoding]) < len(self.variants[None]):
+                return encoding
+        return None
+
+    def make_response(self, request=None):
+        request = request if request is not None else flask.request
+        if self.etag in request.if_none_match:
+            response = flask.Response(status=304)
+        else:
+            encoding = self._select_encoding(request)
+            response = flask.Response(self.variants[encoding], mimetype=self.mimetype)
+            if encoding is not None:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(self.etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        # the ETag is checked on every request, so a new layout is picked up right away
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+def make_json_response(value):
+    return PrecompressedResponse(to_json(value))
@@ -0,0 +1,95 @@
+import re
+from .base import WeaverletException
+
+ROUTE_SEPARATOR = '/'
+ROUTE_PARAM_PATTERN = re.compile(r'^<([A-Za-z_][A-Za-z0-9_]*)>$')
+
+
+class _RouteTrieNode():
+
+    __slots__ = ('static_children', 'param_child', 'param_name', 'route')
+
+    def __init__(self):
+        self.static_children = {}
+        self.param_child = None
+        self.param_name = None
+        self.route = None
+
+
+class RouteTable():
+    '''
+    Routes compiled once into a lookup structure:
+    - static routes live in a hash table keyed by the prefix-resolved path (O(1) lookup).
+    - parameterized routes (e.g. '/item/<id>') live in a path trie (O(path length) lookup).
+    Static routes always win over parameterized ones; within the trie, static segments win over parameters.
+    '''
+
+    def __init__(self, routes, prefix=''):
+        self.prefix = prefix
+        self._static_routes = {}
+        self._trie = _RouteTrieNode()
+        self._has_param_routes = False
+        for route in routes:
+            self.add(route)
+
+    @staticmethod
+    def is_param_route(route):
+        return any(ROUTE_PARAM_PATTERN.match(segment) for segment in route.split(ROUTE_SEPARATOR))
+
+    def add(self, route):
+        path = f'{self.prefix}{route}'
+        if not self.is_param_route(route):
+            self._static_routes[path] = route
+            return
+
+        node = self._trie
+        for segment in path.split(ROUTE_SEPARATOR):
+            param = ROUTE_PARAM_PATTERN.match(segment)
+            if param:
+                if node.param_child is None:
+                    node.param_child = _RouteTrieNode()
+                    node.param_name = param.group(1)
+                elif node.param_name != param.group(1):
+                    raise WeaverletException(
+                        f'Route {route} names parameter "{param.group(1)}" but another route already uses "{node.param_name}" at the same position.')
+                node = node.param_child
+            else:
+                node = node.static_children.setdefault(segment, _RouteTrieNode())
+
+        if node.route is not None:
+            raise WeaverletException(
+                f'Route {route} conflicts with route {node.route}.')
+        node.route = route
+        self._has_param_routes = True
+
+    def match(self, pathname):
+        '''
+        Returns (route, params) for the route matching pathname, or (None, None) if there is no match.
+        '''
+        if pathname is None:
+            return None, None
+
+        route = self._static_routes.get(pathname)
+        if route is not None:
+            return route, {}
+
+        if not self._has_param_routes:
+            return None, None
+
+        segments = pathname.split(ROUTE_SEPARATOR)
+        # depth-first walk with backtracking, trying static segments before parameters
+        stack = [(self._trie, 0, {})]
+        while stack:
+            node, depth, params = stack.pop()
+            if depth == len(segments):
+                if node.route is not None:
+                    return node.route, params
+                continue
+            segment = segments[depth]
+            if node.param_child is not None and segment:
+                stack.append((node.param_child, depth + 1, {**params, node.param_name: segment}))
+            static_child = node.static_children.get(segment)
+            if static_child is not None:
+                stack.append((static_child, depth + 1, params))
+
+        return None, None
@@ -0,0 +1,124 @@
+import gc
+import os
+import signal
+import socket
+import time
+from werkzeug.serving import make_server
+from .base import WeaverletException
+from .logger import logger
+
+
+def prepare_server(wapp):
+    '''
+    Finishes the Flask/Dash setup that Dash would otherwise run on the first request of each process
+    (callback resolution, asset scanning and script generation), and returns the Flask server.
+    After this, the app can be forked and the workers share the component tree, layout and callback map.
+    '''
+    server = wapp.app.server
+    setup_server = wapp.app._setup_server
+    if setup_server in server.before_first_request_funcs:
+        wapp.app._setup_server()
+        server.before_first_request_funcs.remove(setup_server)
+    return server
+
+
+class PreforkServer():
+    '''
+    Serves a WeaverletApp with several worker processes forked from the current process, all accepting
+    connections on one listening socket. The app is fully set up before forking, and the objects allocated
+    until then are moved out of the garbage collector's reach (gc.freeze), so the pages holding them are not
+    written by the workers and stay shared copy-on-write. Each post_fork hook is called in each worker, with
+    the worker index, before it starts serving. Workers that die are replaced.
+    '''
+
+    def __init__(self, wapp, host='127.0.0.1', port=8050, workers=None, threaded=True, post_fork=(), backlog=128):
+        if not hasattr(os, 'fork'):
+            raise WeaverletException(
+                'PreforkServer requires os.fork(), which is not available on this platform.')
+        self.wapp = wapp
+        self.host = host
+        self.port = port
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.threaded = threaded
+        self.post_fork = list(post_fork)
+        self.backlog = backlog
+        self._socket = None
+        self._worker_pids = {}
+        self._running = False
+
+    def serve(self):
+        server = prepare_server(self.wapp)
+        gc.collect()
+        gc.freeze()
+
+        self._socket = socket.create_server((self.host, self.port), backlog=self.backlog)
+        self._socket.set_inheritable(True)
+        logger.info(
+            f'[PreforkServer.serve] serving on http://{self.host}:{self._socket.getsockname()[1]} with {self.workers} workers')
+
+        self._running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        try:
+            for index in range(self.workers):
+                self._spawn_worker(index, server)
+            while self._running:
+                try:
+                    pid, status = os.waitpid(-1, 0)
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                index = self._worker_pids.pop(pid, None)
+                if index is not None and self._running:
+                    logger.warning(
+                        f'[PreforkServer.serve] worker {index} (pid {pid}) exited with status {status}, restarting it')
+                    # do not spin if workers die right after starting
+                    time.sleep(1)
+                    self._spawn_worker(index, server)
+        finally:
+            self._running = False
+            self._stop_workers()
+            self._socket.close()
+            gc.unfreeze()
+
+    def _spawn_worker(self, index, server):
+        pid = os.fork()
+        if pid != 0:
+            self._worker_pids[pid] = index
+            return
+
+        # worker process
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            for hook in self.post_fork:
+                hook(index)
+            worker_server = make_server(self.host, self.port, server, threaded=self.threaded, fd=self._socket.fileno())
+            logger.info(
+                f'[PreforkServer._spawn_worker] worker {index} (pid {os.getpid()}) started')
+            worker_server.serve_forever()
+        except BaseException:
+            logger.exception(
+                f'[PreforkServer._spawn_worker] worker {index} failed')
+            status = 1
+        finally:
+            os._exit(status)
+
+    def _stop(self, signum, frame):
+        self._running = False
+        self._stop_workers()
+
+    def _stop_workers(self):
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self._worker_pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._worker_pids.pop(pid, None)
@@ -0,0 +1,76 @@
+import secrets
+import flask
+from .logger import logger
+
+DEFAULT_SESSION_ID_KEY = 'weaverlet_session_id'
+
+# marks, in the per-request cache, a request without logged user
+_NO_USER = object()
+
+
+class UserSession:
+    '''
+    Keeps the logged user of each browser session. With a backend (any weaverlet.storage backend, e.g.
+    MemoryBackend or SQLiteBackend), the Flask session cookie only holds a random session id and the user
+    object is stored on the server; without one, the user is stored in the Flask session cookie. The user
+    is resolved at most once per request, later calls within the same request reuse it.
+    '''
+
+    def __init__(self, backend=None, user_session_key='user', session_id_key=DEFAULT_SESSION_ID_KEY):
+        self.backend = backend
+        self.user_session_key = user_session_key
+        self.session_id_key = session_id_key
+        self._cache_key = f'_weaverlet_user_{id(self)}'
+
+    def _load_user(self):
+        if self.backend is None:
+            return flask.session.get(self.user_session_key, _NO_USER)
+        session_id = flask.session.get(self.session_id_key)
+        if session_id is None:
+            return _NO_USER
+        # a single backend round trip: get() returns None for missing and expired sessions
+        data = self.backend.get(session_id)
+        if data is None:
+            return _NO_USER
+        return data.get(self.user_session_key, _NO_USER)
+
+    def _get_cached_user(self):
+        if not hasattr(flask.g, self._cache_key):
+            setattr(flask.g, self._cache_key, self._load_user())
+        return getattr(flask.g, self._cache_key)
+
+    def is_logged_in(self):
+        return self._get_cached_user() is not _NO_USER
+
+    def get_user(self):
+        '''
+        Returns the logged user of the current request, or None.
+        '''
+        user = self._get_cached_user()
+        return None if user is _NO_USER else user
+
+    def login_user(self, user):
+        if self.backend is None:
+            flask.session[self.user_session_key] = user
+        else:
+            # a new session id on each login, so a session id known before logging in is useless afterwards
+            previous_session_id = flask.session.get(self.session_id_key)
+            if previous_session_id is not None:
+                self.backend.delete(previous_session_id)
+            session_id = secrets.token_urlsafe(32)
+            self.backend.set(session_id, {self.user_session_key: user})
+            flask.session[self.session_id_key] = session_id
+        setattr(flask.g, self._cache_key, user)
+        logger.debug(
+            '[UserSession.login_user] user logged in')
+
+    def logout_user(self):
+        if self.backend is None:
+            flask.session.pop(self.user_session_key, None)
+        else:
+            session_id = flask.session.pop(self.session_id_key, None)
+            if session_id is not None:
+                self.backend.delete(session_id)
+        setattr(flask.g, self._cache_key, _NO_USER)
+        logger.debug(
+            '[UserSession.logout_user] user logged out')
@@ -0,0 +1,420 @@
+import os
+import time
+import hashlib
+import pickle
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import flask
+from dash_extensions.enrich import ServerStore
+from .base import WeaverletException
+from .logger import logger
+
+
+class StorageBackend(ServerStore, ABC):
+    '''
+    Base class of the server-side storage backends. Backends follow the dash_extensions ServerStore interface,
+    so they can be passed as the backend of a ServersideOutput. Values are pickled; values whose pickle is
+    larger than max_entry_bytes are rejected with a WeaverletException. Entries older than ttl seconds are
+    never returned, even when get() is called with ignore_expired=True. Hits, misses, expirations and
+    evictions are counted, see get_stats() and to_prometheus().
+    '''
+
+    # stats reported as gauges by to_prometheus(), the others are counters
+    gauges = ()
+
+    def __init__(self, max_entry_bytes=None, ttl=None, timer=time.time):
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        self._timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'expirations': self.expirations, 'evictions': self.evictions}
+
+    def to_prometheus(self):
+        '''
+        Prometheus text lines with the counters of the backend, for CallbackMetrics.collectors.
+        '''
+        lines = []
+        labels = f'backend="{type(self).__name__}"'
+        for name, value in self.get_stats().items():
+            metric, metric_type = (name, 'gauge') if name in self.gauges else (f'{name}_total', 'counter')
+            lines.append(f'# TYPE weaverlet_serverside_cache_{metric} {metric_type}')
+            lines.append(f'weaverlet_serverside_cache_{metric}{{{labels}}} {value}')
+        return lines
+
+    def _serialize(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_entry_bytes is not None and len(data) > self.max_entry_bytes:
+            raise WeaverletException(
+                f'Value for key {key} takes {len(data)} bytes, more than the {self.max_entry_bytes} bytes allowed per entry.')
+        return data
+
+    def _get_expiration(self):
+        return self._timer() + self.ttl if self.ttl is not None else None
+
+    def _is_expired(self, expires_at):
+        return expires_at is not None and expires_at <= self._timer()
+
+    @staticmethod
+    def _is_valid_key(key):
+        # browsers may send the initial value of a store (e.g. None or {}) instead of a key
+        return isinstance(key, str)
+
+    @abstractmethod
+    def get(self, key, ignore_expired=False):
+        pass
+
+    @abstractmethod
+    def set(self, key, value):
+        pass
+
+    @abstractmethod
+    def has(self, key):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+
+class MemoryBackend(StorageBackend):
+    '''
+    In-process LRU storage bounded by number of entries and, optionally, by total size in bytes.
+    '''
+
+    def __init__(self, max_entries=1024, max_total_bytes=None, max_entry_bytes=None, ttl=None, timer=time.time):
+        super().__init__(max_entry_bytes=max_entry_bytes, ttl=ttl, timer=timer)
+        self.max_entries = max_entries
+        self.max_total_bytes = max_total_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, ignore_expired=False):
+        if not self._is_valid_key(key):
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            data, expires_at = entry
+            if self._is_expired(expires_at):
+                self._remove(key)
+                self.misses += 1
+                self.expirations += 1
+                return None
+            self._touch(key)
+            self.hits += 1
+        return pickle.loads(data)
+
+    def set(self, key, value):
+        data = self._serialize(key, value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, self._get_expiration())
+            self.total_bytes += len(data)
+            self._evict()
+        return True
+
+    def has(self, key):
+        if not self._is_valid_key(key):
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry[1])
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+
+    def _remove(self, key):
+        data, _ = self._entries.pop(key)
+        self.total_bytes -= len(data)
+
+    def _evict_entry(self, key):
+        logger.debug(
+            f'[{type(self).__name__}._evict] evicting {key}')
+        self._remove(key)
+        self.evictions += 1
+
+    def _evict(self):
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_total_bytes is not None and self.total_bytes > self.max_total_bytes)):
+            self._evict_entry(next(iter(self._entries)))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SignalCacheBackend(MemoryBackend):
+    '''
+    In-process LRU storage for server-side signals, bounded globally by total size in bytes and, per browser
+    session, by bytes and number of entries. When a session goes over its quota, its own least recently used
+    entries are evicted first, so a single session cannot push the entries of the other sessions out of the
+    cache. Sessions are identified by the session id dash_extensions keeps in the Flask session.
+    '''
+
+    gauges = ('bytes', 'entries', 'sessions')
+
+    def __init__(self, max_total_bytes=256 * 1024 * 1024, max_entries=None, max_session_bytes=None, max_session_entries=None,
+                 max_entry_bytes=None, ttl=None, session_key='session_id', timer=time.time):
+        super().__init__(max_entries=max_entries, max_total_bytes=max_total_bytes, max_entry_bytes=max_entry_bytes, ttl=ttl, timer=timer)
+        self.max_session_bytes = max_session_bytes
+        self.max_session_entries = max_session_entries
+        self.session_key = session_key
+        # session id -> OrderedDict of key -> size in bytes, in LRU order
+        self._sessions = {}
+        self._session_bytes = {}
+        self._key_sessions = {}
+
+    def _get_session_id(self):
+        if not flask.has_request_context():
+            return None
+        return flask.session.get(self.session_key)
+
+    def set(self, key, value):
+        data = self._serialize(key, value)
+        session_id = self._get_session_id()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, self._get_expiration())
+            self.total_bytes += len(data)
+            self._sessions.setdefault(session_id, OrderedDict())[key] = len(data)
+            self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + len(data)
+            self._key_sessions[key] = session_id
+            self._evict_session(session_id)
+            self._evict()
+        return True
+
+    def _touch(self, key):
+        super()._touch(key)
+        self._sessions[self._key_sessions[key]].move_to_end(key)
+
+    def _remove(self, key):
+        super()._remove(key)
+        session_id = self._key_sessions.pop(key)
+        session_keys = self._sessions[session_id]
+        self._session_bytes[session_id] -= session_keys.pop(key)
+        if not session_keys:
+            del self._sessions[session_id]
+            del self._session_bytes[session_id]
+
+    def _evict_session(self, session_id):
+        while session_id in self._sessions and (
+                (self.max_session_entries is not None and len(self._sessions[session_id]) > self.max_session_entries) or
+                (self.max_session_bytes is not None and self._session_bytes[session_id] > self.max_session_bytes)):
+            self._evict_entry(next(iter(self._sessions[session_id])))
+
+    def get_session_usage(self):
+        '''
+        Number of entries and bytes stored by each session.
+        '''
+        with self._lock:
+            return {session_id: {'entries': len(keys), 'bytes': self._session_bytes[session_id]}
+                    for session_id, keys in self._sessions.items()}
+
+    def get_stats(self):
+        return {**super().get_stats(), 'bytes': self.total_bytes, 'entries': len(self._entries), 'sessions': len(self._sessions)}
+
+
+class FileSystemBackend(StorageBackend):
+    '''
+    Storage in a directory, one file per key. When there are more than max_entries files, the least recently
+    used ones are removed, down to max_entries minus an eviction_batch fraction of it, so that the directory
+    is only scanned once every many writes. The number of files is counted by each process and recounted on
+    each eviction, so with several processes writing to the directory it may go over max_entries for a while.
+    Reads record the access time of the file, for the LRU eviction, at most once every touch_interval seconds,
+    so that entries read on every request (e.g. user sessions) are not written on every request.
+    '''
+
+    # fraction of max_entries removed at once when the directory is full
+    eviction_batch = 0.1
+
+    def __init__(self, directory='weaverlet_store', max_entries=4096, max_entry_bytes=None, ttl=None, touch_interval=1, timer=time.time):
+        super().__init__(max_entry_bytes=max_entry_bytes, ttl=ttl, timer=timer)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._count = len(self._scan())
+
+    def _get_path(self, key):
+        # keys generated by dash_extensions are hex digests; anything else is hashed into a safe file name
+        name = key if key.isalnum() else hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def get(self, key, ignore_expired=False):
+        if not self._is_valid_key(key):
+            return None
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                # the expiration is pickled apart, before the value, so that has() does not read the value
+                expires_at = pickle.load(f)
+                data = pickle.load(f)
+                accessed = os.fstat(f.fileno()).st_mtime
+        except (OSError, EOFError, pickle.PickleError):
+            self.misses += 1
+            return None
+        if self._is_expired(expires_at):
+            self.delete(key)
+            self.misses += 1
+            self.expirations += 1
+            return None
+        self.hits += 1
+        # the modification time keeps track of the last access, for LRU eviction
+        if time.time() - accessed >= self.touch_interval:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return pickle.loads(data)
+
+    def set(self, key, value):
+        data = self._serialize(key, value)
+        path = self._get_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self._get_expiration(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        is_new = not os.path.exists(path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if is_new:
+                self._count += 1
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict()
+        return True
+
+    def has(self, key):
+        if not self._is_valid_key(key):
+            return False
+        try:
+            with open(self._get_path(key), 'rb') as f:
+                expires_at = pickle.load(f)
+        except (OSError, EOFError, pickle.PickleError):
+            return False
+        return not self._is_expired(expires_at)
+
+    def delete(self, key):
+        try:
+            os.remove(self._get_path(key))
+        except OSError:
+            return
+        with self._lock:
+            self._count -= 1
+
+    def _scan(self):
+        return [entry for entry in os.scandir(self.directory) if entry.is_file() and not entry.name.endswith('.tmp')]
+
+    def _evict(self):
+        # called holding the lock
+        entries = self._scan()
+        self._count = len(entries)
+        target = self.max_entries - int(self.max_entries * self.eviction_batch)
+        if self._count <= target:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:self._count - target]:
+            logger.debug(
+                f'[FileSystemBackend._evict] evicting {entry.name}')
+            try:
+                os.remove(entry.path)
+            except OSError:
+                # removed meanwhile, e.g. by another process
+                pass
+            else:
+                self.evictions += 1
+            self._count -= 1
+
+
+class SQLiteBackend(StorageBackend):
+    '''
+    Storage in a SQLite database file, shareable by several processes. The least recently used rows are
+    removed when there are more than max_entries of them. Reads record the access time of the row at most
+    once every touch_interval seconds, so that rows read on every request are not written on every request.
+    '''
+
+    def __init__(self, path='weaverlet_store.sqlite', max_entries=4096, max_entry_bytes=None, ttl=None, touch_interval=1, timer=time.time):
+        super().__init__(max_entry_bytes=max_entry_bytes, ttl=ttl, timer=timer)
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        with self._get_connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS weaverlet_store '
+                '(key TEXT PRIMARY KEY, value BLOB, accessed REAL, expires REAL)')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS weaverlet_store_accessed ON weaverlet_store (accessed)')
+
+    def _get_connection(self):
+        # one connection per thread (and per process, connections must not cross a fork)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key, ignore_expired=False):
+        if not self._is_valid_key(key):
+            return None
+        connection = self._get_connection()
+        row = connection.execute(
+            'SELECT value, expires, accessed FROM weaverlet_store WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        data, expires_at, accessed = row
+        if self._is_expired(expires_at):
+            self.delete(key)
+            self.misses += 1
+            self.expirations += 1
+            return None
+        self.hits += 1
+        now = self._timer()
+        if now - accessed >= self.touch_interval:
+            with connection:
+                connection.execute(
+                    'UPDATE weaverlet_store SET accessed = ? WHERE key = ?', (now, key))
+        return pickle.loads(data)
+
+    def set(self, key, value):
+        data = self._serialize(key, value)
+        with self._get_connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO weaverlet_store (key, value, accessed, expires) VALUES (?, ?, ?, ?)',
+                (key, sqlite3.Binary(data), self._timer(), self._get_expiration()))
+            if self.max_entries is not None:
+                cursor = connection.execute(
+                    'DELETE FROM weaverlet_store WHERE key IN (SELECT key FROM weaverlet_store ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,))
+                self.evictions += max(cursor.rowcount, 0)
+        return True
+
+    def has(self, key):
+        if not self._is_valid_key(key):
+            return False
+        row = self._get_connection().execute(
+            'SELECT expires FROM weaverlet_store WHERE key = ?', (key,)).fetchone()
+        return row is not None and not self._is_expired(row[0])
+
+    def delete(self, key):
+        with self._get_connection() as connection:
+            connection.execute('DELETE FROM weaverlet_store WHERE key = ?', (key,))